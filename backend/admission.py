@@ -0,0 +1,199 @@
+import bisect
+import itertools
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class Overloaded(Exception):
+    """A request turned away by admission control; retry_after is in seconds"""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("name", "nested", "event", "outcome")
+
+    def __init__(self, name, nested):
+        self.name = name
+        self.nested = nested
+        self.event = threading.Event()
+        # Set under the lock: "admitted", "shed" or "timed_out"
+        self.outcome = None
+
+
+class AdmissionControl:
+    """Concurrency limits per request class, with a bounded priority queue.
+
+    `limits` maps each class to how many of its requests may run at once,
+    highest priority first, and `capacity` caps all classes together. A
+    request that can't run waits in a queue of at most `queue_size` for at
+    most `max_wait` seconds; a freed slot goes to the highest-priority
+    waiter whose class has room. When the queue is full, a newcomer takes
+    the place of the newest waiter of a lower class, which is turned away at
+    once, or is itself turned away. Turned-away requests raise Overloaded
+    without waiting out a timeout.
+    """
+
+    def __init__(self, capacity, limits, queue_size, max_wait, retry_after=1):
+        self.capacity = capacity
+        self.limits = dict(limits)
+        self.priority = {name: i for i, name in enumerate(self.limits)}
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._running = dict.fromkeys(self.limits, 0)
+        self._total = 0
+        # (priority, arrival, waiter), best first
+        self._queue = []
+        self._arrivals = itertools.count()
+        self._counts = {name: dict.fromkeys(("admitted", "queued", "rejected", "shed", "timed_out"), 0)
+                        for name in self.limits}
+
+    def _has_room(self, name, nested):
+        return self._running[name] < self.limits[name] and (nested or self._total < self.capacity)
+
+    def _start(self, name, nested):
+        self._running[name] += 1
+        if not nested:
+            self._total += 1
+        self._counts[name]["admitted"] += 1
+
+    def acquire(self, name, nested=False):
+        """Take a slot of class `name`, waiting if needed; raises Overloaded.
+
+        nested: the caller already holds a slot, so this one counts toward
+        its class limit but not toward capacity.
+        """
+        with self._lock:
+            if self._has_room(name, nested):
+                self._start(name, nested)
+                return
+            priority = self.priority[name]
+            if len(self._queue) >= self.queue_size:
+                if not self._queue or self._queue[-1][0] <= priority:
+                    self._counts[name]["rejected"] += 1
+                    raise Overloaded(f"No room for a {name} request", self.retry_after)
+                _, _, displaced = self._queue.pop()
+                displaced.outcome = "shed"
+                self._counts[displaced.name]["shed"] += 1
+                displaced.event.set()
+            waiter = _Waiter(name, nested)
+            entry = (priority, next(self._arrivals), waiter)
+            bisect.insort(self._queue, entry)
+            self._counts[name]["queued"] += 1
+
+        waiter.event.wait(self.max_wait)
+        with self._lock:
+            if waiter.outcome is None:
+                self._queue.remove(entry)
+                waiter.outcome = "timed_out"
+                self._counts[name]["timed_out"] += 1
+        if waiter.outcome == "admitted":
+            return
+        if waiter.outcome == "shed":
+            raise Overloaded(f"{name} request shed for higher-priority requests", self.retry_after)
+        raise Overloaded(f"{name} request waited {self.max_wait}s without a slot", self.retry_after)
+
+    def release(self, name, nested=False):
+        with self._lock:
+            self._running[name] -= 1
+            if not nested:
+                self._total -= 1
+            i = 0
+            while i < len(self._queue):
+                waiter = self._queue[i][2]
+                if self._has_room(waiter.name, waiter.nested):
+                    del self._queue[i]
+                    self._start(waiter.name, waiter.nested)
+                    waiter.outcome = "admitted"
+                    waiter.event.set()
+                else:
+                    i += 1
+
+    @contextmanager
+    def slot(self, name, nested=False):
+        self.acquire(name, nested)
+        try:
+            yield
+        finally:
+            self.release(name, nested)
+
+    def stats(self):
+        with self._lock:
+            waiting = dict.fromkeys(self.limits, 0)
+            for _, _, waiter in self._queue:
+                waiting[waiter.name] += 1
+            return {
+                "capacity": self.capacity,
+                "running": self._total,
+                "queue_size": self.queue_size,
+                "waiting": len(self._queue),
+                "classes": {
+                    name: {"limit": limit, "running": self._running[name], "waiting": waiting[name],
+                           **self._counts[name]}
+                    for name, limit in self.limits.items()
+                }
+            }
+
+
+class RateLimiter:
+    """Per-client token buckets holding up to `burst` tokens, refilled at `rate` a second.
+
+    Buckets are kept for at most `max_clients` clients, least recently seen
+    dropped first; a dropped client comes back with a full bucket, as a new
+    one would.
+    """
+
+    def __init__(self, rate, burst, max_clients=100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def take(self, client, cost=1):
+        """Spend `cost` of the client's tokens and return 0, or return the
+        seconds until it has enough, spending nothing"""
+        cost = min(cost, self.burst)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                tokens = self.burst
+            else:
+                tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                self._buckets.move_to_end(client)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0
+                self.allowed += 1
+            else:
+                wait = (cost - tokens) / self.rate
+                self.limited += 1
+            self._buckets[client] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "clients": len(self._buckets),
+                "allowed": self.allowed,
+                "limited": self.limited
+            }
+
+
+def retry_after_header(seconds):
+    """Retry-After value for a wait in seconds: whole seconds, at least 1"""
+    return str(max(1, math.ceil(seconds)))
@@ -0,0 +1,165 @@
+"""Latency benchmarks for the backend hot paths.
+
+    python benchmark.py --players 50000          # generate a synthetic DB first
+    python benchmark.py --db players_awards.json --only guess
+
+Each case reports p50/p95/p99 latency and ops/sec. The database is chosen
+before the backend is imported (PLAYERS_DB_PATH), and game stats go to a
+throwaway SQLite file so runs don't touch the real one.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from generate_players import write_database
+
+
+def percentile(sorted_ns, fraction):
+    index = min(len(sorted_ns) - 1, int(round(fraction * (len(sorted_ns) - 1))))
+    return sorted_ns[index] / 1e6
+
+
+def run_case(name, fn, inputs, iterations, warmup):
+    """Time fn(*args) over inputs, cycling them, one sample per call"""
+    for i in range(min(warmup, iterations)):
+        fn(*inputs[i % len(inputs)])
+    samples = []
+    clock = time.perf_counter_ns
+    started = clock()
+    for i in range(iterations):
+        args = inputs[i % len(inputs)]
+        t0 = clock()
+        fn(*args)
+        samples.append(clock() - t0)
+    elapsed = (clock() - started) / 1e9
+    samples.sort()
+    return {
+        "case": name,
+        "ops": iterations,
+        "p50_ms": round(percentile(samples, 0.50), 4),
+        "p95_ms": round(percentile(samples, 0.95), 4),
+        "p99_ms": round(percentile(samples, 0.99), 4),
+        "ops_per_sec": round(iterations / elapsed, 1) if elapsed else None,
+    }
+
+
+def typo(rng, name):
+    """Swap two adjacent letters, the most common way a guess is misspelled"""
+    if len(name) < 4:
+        return name + "e"
+    i = rng.randrange(1, len(name) - 2)
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def build_cases(backend, rng, iterations, scan_iterations):
+    db = backend.database
+    names = list(db.players.keys())
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(1000)]
+    targets = [(rng.choice(names),) for _ in range(max(scan_iterations, 1))]
+    # Typos that still resolve, so the fuzzy case measures matches, not misses
+    fuzzy = []
+    for _ in range(2000):
+        guess = typo(rng, rng.choice(names))
+        if db.name_index.exact(guess) is None and db.name_index.lookup(guess) is not None:
+            fuzzy.append((guess,))
+            if len(fuzzy) == 200:
+                break
+    misses = [("Qzx%04d Vwkj" % i,) for i in range(200)]
+    client = backend.app.test_client()
+
+    def similarity(guess, target):
+        backend.compute_similarity(db.players[guess], db.players[target], guess, target)
+
+    def cold_top5(target):
+        backend._top_similar(target, 5, backend.default_scoring, db)
+
+    def post_guess(guess, target):
+        response = client.post("/api/guess", json={"guess": guess, "target": target})
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/guess returned {response.status_code}")
+
+    def post_win(target):
+        backend.top_cache.reset(db.version)
+        post_guess(target, target)
+
+    def players_data(encoding):
+        response = client.get("/api/players_data", headers={"Accept-Encoding": encoding})
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/players_data returned {response.status_code}")
+
+    def players_data_cold():
+        db.payloads.reset()
+        players_data("gzip")
+
+    return [
+        ("compute_similarity", similarity, pairs, iterations),
+        ("get_player exact", backend.get_player, [(a,) for a, _ in pairs], iterations),
+        ("get_player fuzzy", backend.get_player, fuzzy or misses, iterations),
+        ("get_player miss", backend.get_player, misses, iterations),
+        ("top5 engine full scan", lambda t: db.engine.top_n(t, 5), targets, scan_iterations),
+        ("top5 pruned", lambda t: backend.top_n_pruned(db.engine, t, 5), targets, scan_iterations),
+        ("top5 serving path (uncached)", cold_top5, targets, scan_iterations),
+        ("create_players_summary", backend.create_players_summary, [()], max(1, scan_iterations // 5)),
+        ("POST /api/guess", post_guess, pairs, iterations),
+        ("POST /api/guess win (uncached top 5)", post_win, targets, scan_iterations),
+        ("GET /api/players_data gzip", players_data, [("gzip",)], iterations),
+        ("GET /api/players_data identity", players_data, [("identity",)], iterations),
+        ("GET /api/players_data cold", players_data_cold, [()], max(1, scan_iterations // 5)),
+    ]
+
+
+def print_table(results):
+    print(f"{'case':<38} {'ops':>7} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/sec':>11}")
+    print("-" * 90)
+    for r in results:
+        print(f"{r['case']:<38} {r['ops']:>7} {r['p50_ms']:>10.4f} {r['p95_ms']:>10.4f} "
+              f"{r['p99_ms']:>10.4f} {r['ops_per_sec']:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NBA Mantle backend hot paths")
+    parser.add_argument("--db", help="player database to load (default: generate one)")
+    parser.add_argument("--players", type=int, default=5000, help="synthetic DB size when --db is not given")
+    parser.add_argument("--iterations", type=int, default=2000, help="samples for per-request cases")
+    parser.add_argument("--scan-iterations", type=int, default=50, help="samples for whole-database cases")
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_out", help="also write results to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="nba-mantle-bench-")
+    db_path = args.db
+    if db_path is None:
+        db_path = os.path.join(workdir, f"players_{args.players}.json")
+        started = time.perf_counter()
+        count = write_database(db_path, args.players, args.seed)
+        print(f"Generated {count} players in {time.perf_counter() - started:.1f}s")
+
+    os.environ["PLAYERS_DB_PATH"] = os.path.abspath(db_path)
+    os.environ.setdefault("STATS_DB_PATH", os.path.join(workdir, "game_stats.sqlite3"))
+    started = time.perf_counter()
+    import nba_mantle_backend as backend
+    print(f"Loaded {len(backend.database.players)} players in {time.perf_counter() - started:.1f}s\n")
+
+    rng = random.Random(args.seed)
+    results = []
+    for name, fn, inputs, iterations in build_cases(backend, rng, args.iterations, args.scan_iterations):
+        if args.only and args.only.lower() not in name.lower():
+            continue
+        print(f"running {name} ...", flush=True)
+        results.append(run_case(name, fn, inputs, iterations, warmup=max(1, iterations // 10)))
+    print()
+    print_table(results)
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump({"players": len(backend.database.players), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+import heapq
+
+import numpy as np
+
+from scoring_profiles import CLASSIC
+
+
+def roster_independent_bounds(target):
+    """Feature upper bounds for a player sharing no season (so no teammate years) with `target`"""
+    return {
+        "shared_seasons": 0,
+        "max_streak": 1,
+        "teammate_years": 0,
+        "team_overlap": len(target.teams),
+        "tenure": 0,
+        "shared_all_star": int(bool(target.all_star_seasons)),
+        "shared_all_team": int(bool(target.all_team_selections)),
+        "shared_awards": int(bool(target.awards_won)),
+    }
+
+
+def top_n_pruned(engine, target_name, n=5, profile=None):
+    """Top `n` by scoring only roster-overlap candidates in upper-bound order.
+
+    Candidates come from the engine's inverted (team, season) postings, which
+    are exactly the target's neighbours in the teammate graph. Each gets an
+    upper bound from its shared season count and seasons together,
+    and scoring stops once no remaining candidate can beat the current n-th
+    best. Players outside the candidate set are covered by a single bound;
+    if that bound can't be ruled out, returns None so the caller can fall
+    back to a full scan. Bounds come from the scoring profile, so this is
+    exact for any profile.
+    """
+    profile = profile or CLASSIC
+    target_idx = engine.index[target_name]
+    target = engine.players[target_idx]
+
+    # Candidate generation from the inverted index
+    rows = engine.seasons.rows_for(target.season_keys)
+    candidates, shared = np.unique(rows, return_counts=True)
+    keep = candidates != target_idx
+    candidates, shared = candidates[keep], shared[keep]
+    mate_rows, mate_years = engine.teammates.neighbors(target_idx)
+    teammate_years = np.zeros(len(candidates), dtype=np.int64)
+    teammate_years[np.searchsorted(candidates, mate_rows)] = mate_years
+
+    # Upper bounds: exact season and teammate counts, optimistic everything else
+    players = engine.players
+    team_overlap = np.fromiter(
+        (len(players[i].teams & target.teams) for i in candidates.tolist()),
+        dtype=np.int64, count=len(candidates))
+    rest = roster_independent_bounds(target)
+    # Broadcast: a profile may not depend on any roster feature at all
+    bounds = np.broadcast_to(profile.upper_bound({
+        **rest,
+        "shared_seasons": shared,
+        "max_streak": np.maximum(shared, 1),
+        "teammate_years": teammate_years,
+        "team_overlap": team_overlap,
+        "tenure": np.minimum(shared, team_overlap * 3),
+    }), candidates.shape)
+
+    # Best n so far as a min-heap of (score, -row): ties favour database order
+    best = []
+    for i in np.lexsort((candidates, -bounds)).tolist():
+        if len(best) == n and bounds[i] < best[0][0]:
+            break
+        row = int(candidates[i])
+        score, _ = profile.score(players[row], target)
+        entry = (score, -row)
+        if len(best) < n:
+            heapq.heappush(best, entry)
+        elif entry > best[0]:
+            heapq.heapreplace(best, entry)
+
+    # Everyone else shares no season, so no teammate years, with the target
+    rest_bound = profile.upper_bound(rest)
+    outside = engine.size - 1 - len(candidates)
+    if outside and (len(best) < n or rest_bound >= best[0][0]):
+        return None
+
+    best.sort(reverse=True)
+    return [(engine.names[-row], score) for score, row in best]
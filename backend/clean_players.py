@@ -1,48 +1,279 @@
+"""Clean players.json into players_cleaned.json.
+
+    python clean_players.py [players.json] [--out players_cleaned.json] [--workers N] [--full]
+
+Fixes mis-decoded names, drops "TOT" (multi-team total) seasons, fills in
+the derived fields the server needs (start_year, teams, career_length)
+and validates the schema compute_similarity relies on. A missing
+draft_year stays missing: scoring treats it as 0, and only the player
+API guesses one for display. Invalid players are reported and left out. Name-keyed
+teammate_years maps are dropped: the server derives the teammate graph
+from the season rosters.
+
+The input is parsed as a stream of player records and changed players are
+cleaned in parallel across a process pool. A manifest next to the output
+records a content hash and output location per player, so re-runs copy
+unchanged players straight from the previous output instead of cleaning
+them again. Output is compact JSON, written to a temp file and swapped in.
+"""
+import argparse
+import hashlib
 import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from player_stream import iter_players
+
+# Bump when cleaning or validation changes, so every player is re-cleaned
+PIPELINE_VERSION = 3
+MANIFEST_FORMAT = "nba-mantle-clean-manifest"
+BATCH_SIZE = 256
+
 
 def fix_name_encoding(bad_name):
     try:
         return bad_name.encode('latin1').decode('utf-8')
-    except UnicodeDecodeError:
+    except UnicodeError:
         return bad_name  # leave unchanged if decode fails
 
-# Step 1: Load the original JSON file
-with open("players.json", "r", encoding="utf-8") as f:
-    players = json.load(f)
 
-# Step 2: Fix any badly encoded player names
-fixed_players = {}
-renamed_count = 0
-for name, data in players.items():
+def iter_raw_players(path, chunk_size=1 << 20):
+    """Yield (name, raw JSON text of the record) for each top-level entry, reading in chunks"""
+    with open(path, "rb") as f:
+        for name, _, raw in iter_players(f, path, chunk_size):
+            yield name, raw
+
+
+def content_hash(name, raw):
+    return hashlib.sha1(f"{PIPELINE_VERSION}\0{name}\0{raw}".encode("utf-8")).hexdigest()
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_str_list(value):
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+
+def _season_errors(seasons):
+    if not isinstance(seasons, list):
+        return ["seasons must be a list"]
+    for s in seasons:
+        if not (isinstance(s, dict) and isinstance(s.get("team"), str) and s["team"]
+                and _is_int(s.get("season"))):
+            return [f"invalid season entry {s!r}"]
+    return []
+
+
+def derive_fields(player):
+    """Fill in the fields the server would otherwise compute per request"""
+    seasons = player.get("seasons", [])
+    years = [s["season"] for s in seasons]
+    if "start_year" not in player and years:
+        player["start_year"] = min(years)
+    if "teams" not in player:
+        player["teams"] = list(dict.fromkeys(s["team"] for s in seasons))
+    if not player.get("career_length", 0) > 0:
+        player["career_length"] = len(set(years))
+
+
+def validate_player(player):
+    """Schema problems that would break compute_similarity or the server; empty if valid"""
+    if not isinstance(player, dict):
+        return ["record is not an object"]
+    errors = _season_errors(player.get("seasons"))
+    for key in ("start_year", "career_length"):
+        if not _is_int(player.get(key)):
+            errors.append(f"{key} must be an integer" if key in player else f"missing {key}")
+    if "draft_year" in player and not _is_int(player["draft_year"]):
+        errors.append("draft_year must be an integer")
+    if not isinstance(player.get("position", ""), str):
+        errors.append("position must be a string")
+    if not _is_str_list(player.get("teams")):
+        errors.append("teams must be a list of team names")
+    if not all(_is_int(v) for v in player.get("all_star_seasons", [])):
+        errors.append("all_star_seasons must be a list of years")
+    selections = player.get("all_team_selections", [])
+    if not (isinstance(selections, list) and all(
+            isinstance(s, dict) and _is_int(s.get("season")) and isinstance(s.get("type"), str)
+            for s in selections)):
+        errors.append("all_team_selections must be a list of {season, type}")
+    if not _is_str_list(player.get("awards_won", [])):
+        errors.append("awards_won must be a list of award names")
+    return errors
+
+
+def clean_player(name, raw):
+    """Return (clean name, compact record bytes or None, errors, TOT seasons removed)"""
     fixed_name = fix_name_encoding(name)
-    if fixed_name != name:
-        renamed_count += 1
-    fixed_players[fixed_name] = data
-
-# Step 3: Remove any season with team == "TOT"
-updated_count = 0
-for player_name, data in fixed_players.items():
-    if "seasons" in data:
-        original_len = len(data["seasons"])
-        data["seasons"] = [s for s in data["seasons"] if s.get("team") != "TOT"]
-        cleaned_len = len(data["seasons"])
-        if original_len != cleaned_len:
-            print(f"{player_name}: removed {original_len - cleaned_len} 'TOT' season(s)")
-            updated_count += 1
-
-# Step 4: Save the cleaned data to a new file
-with open("players_cleaned.json", "w", encoding="utf-8") as f:
-    json.dump(fixed_players, f, indent=2, ensure_ascii=False)  # ensure_ascii=False preserves characters like č
-
-print(f"\n✅ Finished cleaning.")
-print(f" - {renamed_count} player names were fixed.")
-print(f" - {updated_count} players had 'TOT' seasons removed.\n")
-
-# Step 5: Confirm one player
-player_check = "Luka Dončić"  # now correctly spelled
-if player_check in fixed_players:
-    print(f"{player_check}'s seasons (after cleaning):")
-    for season in fixed_players[player_check]["seasons"]:
-        print(f"  - {season['season']} with {season['team']}")
-else:
-    print(f"{player_check} not found in player list.")
+    player = json.loads(raw)
+    removed = 0
+    if isinstance(player, dict):
+        player.pop("teammate_years", None)
+    if isinstance(player, dict) and isinstance(player.get("seasons"), list):
+        seasons = player["seasons"]
+        player["seasons"] = [s for s in seasons if not (isinstance(s, dict) and s.get("team") == "TOT")]
+        removed = len(seasons) - len(player["seasons"])
+        if not _season_errors(player["seasons"]):
+            derive_fields(player)
+    errors = validate_player(player)
+    if errors:
+        return fixed_name, None, errors, removed
+    entry = json.dumps(fixed_name, ensure_ascii=False) + ":" + json.dumps(
+        player, ensure_ascii=False, separators=(",", ":"))
+    return fixed_name, entry.encode("utf-8"), errors, removed
+
+
+def clean_batch(items):
+    return [clean_player(name, raw) for name, raw in items]
+
+
+def load_manifest(path, out_path):
+    """Previous per-player hashes and output slices, if the output they describe is intact"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        stat = os.stat(out_path)
+    except (OSError, ValueError):
+        return {}
+    if (manifest.get("format") != MANIFEST_FORMAT or manifest.get("version") != PIPELINE_VERSION
+            or manifest.get("output_size") != stat.st_size
+            or manifest.get("output_mtime_ns") != stat.st_mtime_ns):
+        print(f"Warning: {path} doesn't match {out_path}. Cleaning every player.")
+        return {}
+    return manifest.get("players", {})
+
+
+def _batches(players, previous, size):
+    """Group the stream into ("copy", name, hash, output slice) / ("clean", name, hash, raw) items"""
+    batch = []
+    for name, raw in players:
+        digest = content_hash(name, raw)
+        entry = previous.get(name)
+        if entry is not None and entry[0] == digest:
+            batch.append(("copy", name, digest, entry[1:]))
+        else:
+            batch.append(("clean", name, digest, raw))
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def run_pipeline(in_path, out_path, manifest_path=None, workers=None, full=False, verbose=False):
+    manifest_path = manifest_path or out_path + ".manifest.json"
+    previous = {} if full else load_manifest(manifest_path, out_path)
+    old_output = None
+    if previous:
+        old_output = open(out_path, "rb")
+
+    stats = {"players": 0, "cleaned": 0, "reused": 0, "renamed": 0, "tot_removed": 0, "invalid": 0}
+    new_manifest = {}
+    written = set()
+    tmp_path = out_path + ".tmp"
+    pool = ProcessPoolExecutor(max_workers=workers) if workers != 1 else None
+    max_in_flight = (pool._max_workers if pool is not None else 1) * 4
+
+    def submit(batch):
+        items = [(name, raw) for kind, name, _, raw in batch if kind == "clean"]
+        if pool is not None and items:
+            return batch, pool.submit(clean_batch, items)
+        future = Future()
+        future.set_result(clean_batch(items))
+        return batch, future
+
+    try:
+        with open(tmp_path, "wb") as out:
+            out.write(b"{")
+            offset = 1
+
+            def write_entry(name, digest, entry, removed):
+                nonlocal offset
+                if written:
+                    out.write(b",")
+                    offset += 1
+                out.write(entry)
+                new_manifest[name] = [digest, offset, len(entry), removed]
+                offset += len(entry)
+
+            def drain(batch, future):
+                cleaned = iter(future.result())
+                for kind, name, digest, payload in batch:
+                    stats["players"] += 1
+                    if kind == "copy":
+                        start, length, removed = payload
+                        old_output.seek(start)
+                        entry = old_output.read(length)
+                        fixed_name = fix_name_encoding(name)
+                        stats["reused"] += 1
+                    else:
+                        fixed_name, entry, errors, removed = next(cleaned)
+                        stats["cleaned"] += 1
+                        if removed and verbose:
+                            print(f"{fixed_name}: removed {removed} 'TOT' season(s)")
+                        if entry is None:
+                            stats["invalid"] += 1
+                            print(f"Warning: skipping {name!r}: {'; '.join(errors)}")
+                            continue
+                    stats["renamed"] += fixed_name != name
+                    if fixed_name in written:
+                        print(f"Warning: duplicate player {fixed_name!r}; keeping the first record")
+                        continue
+                    write_entry(name, digest, entry, removed)
+                    written.add(fixed_name)
+                    stats["tot_removed"] += removed > 0
+
+            # Results are written in input order with a bounded number of batches in flight
+            in_flight = deque()
+            for batch in _batches(iter_raw_players(in_path), previous, BATCH_SIZE):
+                in_flight.append(submit(batch))
+                if len(in_flight) >= max_in_flight:
+                    drain(*in_flight.popleft())
+            while in_flight:
+                drain(*in_flight.popleft())
+            out.write(b"}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if old_output is not None:
+            old_output.close()
+
+    os.replace(tmp_path, out_path)
+    stat = os.stat(out_path)
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "version": PIPELINE_VERSION,
+        "input": os.path.basename(in_path),
+        "output_size": stat.st_size,
+        "output_mtime_ns": stat.st_mtime_ns,
+        "players": new_manifest,
+    }
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean players.json for the server")
+    parser.add_argument("input", nargs="?", default="players.json")
+    parser.add_argument("--out", default="players_cleaned.json")
+    parser.add_argument("--manifest", help="default: <out>.manifest.json")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (1 = no pool)")
+    parser.add_argument("--full", action="store_true", help="ignore the manifest and clean every player")
+    parser.add_argument("--verbose", action="store_true", help="list players that had TOT seasons removed")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stats = run_pipeline(args.input, args.out, args.manifest, args.workers, args.full, args.verbose)
+    print(f"\n✅ Finished cleaning {stats['players']} players in {time.perf_counter() - started:.1f}s.")
+    print(f" - {stats['cleaned']} cleaned, {stats['reused']} unchanged since the last run.")
+    print(f" - {stats['renamed']} player names were fixed.")
+    print(f" - {stats['tot_removed']} players had 'TOT' seasons removed.")
+    if stats["invalid"]:
+        print(f" - {stats['invalid']} invalid players were left out (see warnings above).")
+    print()
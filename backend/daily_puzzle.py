@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+# Same pool play.py draws from: modern players with real careers
+MODERN_START_YEAR = 2003
+MODERN_CAREER_LENGTH = 5
+
+
+class TargetRanking:
+    """Every player ranked against one target, stored as compact arrays.
+
+    Rank 1 is the target itself; the rest follow by score, ties in database
+    order, so ranks 2-6 are exactly the win-path top 5.
+    """
+
+    def __init__(self, engine, target_name, profile=None):
+        self.target = target_name
+        target_idx = engine.index[target_name]
+        scores = engine.score_all(target_name, profile)
+        scores[target_idx] = 100
+        # Scores cap at 99, so the target's 100 always sorts first
+        self.order = np.argsort(-scores, kind="stable").astype(np.int32)
+        self.ranks = np.empty(engine.size, dtype=np.int32)
+        self.ranks[self.order] = np.arange(1, engine.size + 1, dtype=np.int32)
+        self.scores = scores.astype(np.uint8)
+        self.names = engine.names
+        self.index = engine.index
+
+    def __len__(self):
+        return len(self.order)
+
+    def rank(self, name):
+        return int(self.ranks[self.index[name]])
+
+    def top(self, n=5):
+        """Best `n` players other than the target, as (name, score)"""
+        return [(self.names[i], int(self.scores[i])) for i in self.order[1:n + 1].tolist()]
+
+
+class PuzzleCalendar:
+    """Maps puzzle IDs to targets: configured overrides first, then a seeded daily pick"""
+
+    def __init__(self, players_db, epoch, salt="", overrides=None):
+        self.epoch = epoch
+        self.salt = salt
+        self.overrides = {k: v for k, v in (overrides or {}).items() if isinstance(v, str) and v in players_db}
+        self.pool = [
+            name for name, info in players_db.items()
+            if info.get("start_year", 0) >= MODERN_START_YEAR
+            and info.get("career_length", 0) >= MODERN_CAREER_LENGTH
+        ] or list(players_db)
+
+    def today(self):
+        today = datetime.now(timezone.utc).date()
+        return (today - self.epoch).days + 1
+
+    def date_of(self, puzzle_id):
+        return date.fromordinal(self.epoch.toordinal() + puzzle_id - 1)
+
+    def published(self, puzzle_id):
+        """Whether the puzzle is out: numbered from 1 at the epoch, up to today's"""
+        return 1 <= puzzle_id <= self.today()
+
+    def target(self, puzzle_id):
+        """The puzzle's answer, or None if it isn't published yet (or never will be)"""
+        if not self.published(puzzle_id):
+            return None
+        if puzzle_id in self.overrides:
+            return self.overrides[puzzle_id]
+        if not self.pool:
+            return None
+        digest = hashlib.sha256(f"{self.salt}:{puzzle_id}".encode("utf-8")).digest()
+        return self.pool[int.from_bytes(digest[:8], "big") % len(self.pool)]
+
+
+def load_puzzle_overrides(path):
+    """Optional {"<puzzle id>": "<player name>"} file of hand-picked targets, keyed by int"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read puzzle overrides {path}: {e}")
+        return {}
+    if not isinstance(data, dict):
+        print(f"Warning: {path} is not a JSON object. Using the daily pick for every puzzle.")
+        return {}
+    overrides = {}
+    for key, name in data.items():
+        try:
+            overrides[int(key)] = name
+        except ValueError:
+            print(f"Warning: skipping puzzle override {key!r} in {path}: not a puzzle number")
+    return overrides
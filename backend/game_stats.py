@@ -0,0 +1,144 @@
+import atexit
+import os
+import sqlite3
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS target_stats (
+    target TEXT PRIMARY KEY,
+    guesses INTEGER NOT NULL DEFAULT 0,
+    solves INTEGER NOT NULL DEFAULT 0,
+    reveals INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+UPSERT = """
+INSERT INTO target_stats (target, guesses, solves, reveals) VALUES (?, ?, ?, ?)
+ON CONFLICT(target) DO UPDATE SET
+    guesses = guesses + excluded.guesses,
+    solves = solves + excluded.solves,
+    reveals = reveals + excluded.reveals
+"""
+
+GUESS, SOLVE, REVEAL = range(3)
+
+
+class GameStats:
+    """Game statistics shared by every worker through one SQLite file.
+
+    Request threads only append events to an in-process deque (atomic in
+    CPython, so no lock and no disk I/O on the hot path). A background
+    thread per worker drains the deque every `flush_interval` seconds and
+    adds the batch to SQLite in a single transaction. The database runs in
+    WAL mode so concurrent workers' flushes and /api/stats reads don't
+    block each other.
+    """
+
+    def __init__(self, path, flush_interval=5.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._events = deque()
+        self._pid = None
+        self._wakeup = threading.Event()
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(SCHEMA)
+        atexit.register(self.flush)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ensure_flusher(self):
+        # Started lazily so each forked gunicorn worker gets its own thread
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._events = deque()
+                threading.Thread(target=self._run, name="game-stats-flusher", daemon=True).start()
+                self._pid = os.getpid()
+
+    def record_guess(self, target, solved=False):
+        self._ensure_flusher()
+        self._events.append((target, SOLVE if solved else GUESS))
+
+    def record_reveal(self, target):
+        self._ensure_flusher()
+        self._events.append((target, REVEAL))
+
+    def _run(self):
+        while not self._wakeup.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Warning: could not flush game stats: {e}")
+
+    def flush(self):
+        """Write every pending event to SQLite as one batch"""
+        with self._flush_lock:
+            events = self._events
+            batch = {}
+            while events:
+                try:
+                    target, kind = events.popleft()
+                except IndexError:
+                    break
+                counts = batch.setdefault(target, [0, 0, 0])
+                # Solves and reveals are guesses too, matching the old counter
+                counts[0] += 1
+                if kind == SOLVE:
+                    counts[1] += 1
+                elif kind == REVEAL:
+                    counts[2] += 1
+            if not batch:
+                return 0
+            with self._connect() as conn:
+                conn.executemany(UPSERT, [(t, g, s, r) for t, (g, s, r) in batch.items()])
+            return sum(counts[0] for counts in batch.values())
+
+    def summary(self):
+        with self._connect() as conn:
+            guesses, targets, solves, reveals = conn.execute(
+                "SELECT COALESCE(SUM(guesses), 0), COUNT(*), COALESCE(SUM(solves), 0), "
+                "COALESCE(SUM(reveals), 0) FROM target_stats").fetchone()
+        return {
+            "total_guesses": guesses,
+            "games_played": targets,
+            "solves": solves,
+            "reveals": reveals,
+            "pending_guesses": len(self._events),
+        }
+
+    def targets(self, limit=20, target=None):
+        """Per-target guess counts and solve rates, most-guessed first"""
+        query = "SELECT target, guesses, solves, reveals FROM target_stats"
+        params = ()
+        if target is not None:
+            query += " WHERE target = ?"
+            params = (target,)
+        query += " ORDER BY guesses DESC, target LIMIT ?"
+        with self._connect() as conn:
+            rows = conn.execute(query, params + (limit,)).fetchall()
+        return [_target_row(*row) for row in rows]
+
+
+def _target_row(target, guesses, solves, reveals):
+    finished = solves + reveals
+    return {
+        "target": target,
+        "guesses": guesses,
+        "solves": solves,
+        "reveals": reveals,
+        "solve_rate": round(solves / finished, 4) if finished else None,
+    }
@@ -0,0 +1,154 @@
+"""Generate a realistic synthetic players_awards.json of any size.
+
+    python generate_players.py --players 50000 --out players_50k.json
+
+Players get careers, season-by-season rosters, trades, positions, draft
+years, All-Star/All-Team selections and awards, in the same shape as the
+cleaned database (the server derives teammates from the rosters, see
+teammate_graph.py). League size grows with the player count so rosters
+stay around 15 deep, the way adding ABA/G-League history would. Players
+are written as they are generated; only the set of names used is kept in
+memory.
+"""
+import argparse
+import json
+import math
+import random
+import time
+
+FIRST_YEAR = 1947
+LAST_YEAR = 2025
+ROSTER_SIZE = 15
+
+NBA_TEAMS = [
+    "ATL", "BOS", "BRK", "CHI", "CHO", "CLE", "DAL", "DEN", "DET", "GSW",
+    "HOU", "IND", "LAC", "LAL", "MEM", "MIA", "MIL", "MIN", "NOP", "NYK",
+    "OKC", "ORL", "PHI", "PHO", "POR", "SAC", "SAS", "TOR", "UTA", "WAS",
+]
+POSITIONS = ["PG", "SG", "SF", "PF", "C", "PG-SG", "SG-SF", "SF-PF", "PF-C", "G", "F"]
+POSITION_WEIGHTS = [14, 14, 14, 14, 14, 6, 6, 6, 6, 3, 3]
+FIRST_NAMES = [
+    "James", "Chris", "Kevin", "Anthony", "Marcus", "Tyler", "Jamal", "Jalen", "Jaylen",
+    "Michael", "Kyle", "Brandon", "Derrick", "Andre", "Tony", "Paul", "Devin", "Trae",
+    "Luka", "Nikola", "Goran", "Bogdan", "Dario", "Jusuf", "Kristaps", "Dāvis", "Ömer",
+    "Álex", "José", "Manu", "Dražen", "Toni", "Vlade", "Hedo", "Šarūnas", "Žydrūnas",
+    "Giannis", "Thanasis", "Pascal", "Serge", "Bismack", "Clint", "Rudy", "Evan", "Nicolas",
+    "DeMar", "LaMarcus", "De'Aaron", "D'Angelo", "Shai", "Jrue", "Zion", "Ja", "Bam",
+]
+LAST_NAMES = [
+    "Johnson", "Williams", "Brown", "Jones", "Davis", "Miller", "Wilson", "Moore", "Taylor",
+    "Thomas", "Jackson", "White", "Harris", "Martin", "Thompson", "Robinson", "Walker",
+    "Young", "Allen", "Wright", "Green", "Adams", "Baker", "Nelson", "Carter", "Mitchell",
+    "Dončić", "Jokić", "Dragić", "Bogdanović", "Šarić", "Nurkić", "Porziņģis", "Bertāns",
+    "Aşık", "Abrines", "Calderón", "Ginóbili", "Petrović", "Kukoč", "Divac", "Türkoğlu",
+    "Jasikevičius", "Ilgauskas", "Antetokounmpo", "Siakam", "Ibaka", "Biyombo", "Capela",
+    "Gobert", "Fournier", "Batum", "DeRozan", "Aldridge", "Fox", "Russell", "Gilgeous-Alexander",
+]
+SUFFIXES = ["", "", "", "", "", "", " Jr.", " II", " III", " Sr."]
+ALL_TEAM_TYPES = ["All-NBA 1st", "All-NBA 2nd", "All-NBA 3rd", "All-Defensive 1st",
+                  "All-Defensive 2nd", "All-Rookie 1st", "All-Rookie 2nd"]
+AWARDS = ["MVP", "DPOY", "ROY", "6MOY", "MIP", "Finals MVP", "Clutch POY"]
+
+
+def unique_names(rng):
+    """Endless distinct names. Once a name and a middle-initial variant are
+    both taken, the name gets a number, so any count terminates."""
+    seen = set()
+    repeats = {}
+    while True:
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}{rng.choice(SUFFIXES)}"
+        if name in seen:
+            # Same-name players get a middle initial, like real duplicate names
+            base = name
+            name = f"{rng.choice(FIRST_NAMES)} {chr(65 + rng.randrange(26))}. {rng.choice(LAST_NAMES)}"
+            while name in seen:
+                repeats[base] = repeats.get(base, 1) + 1
+                name = f"{base} ({repeats[base]})"
+        seen.add(name)
+        yield name
+
+
+def league_teams(count):
+    extra = [f"X{i:03d}" for i in range(max(0, count - len(NBA_TEAMS)))]
+    return (NBA_TEAMS + extra)[:count]
+
+
+def generate(count, seed=0):
+    """Yield (name, player) in database order"""
+    rng = random.Random(seed)
+    years = LAST_YEAR - FIRST_YEAR + 1
+    # Average career is ~5.5 seasons; size the league so rosters stay ~15 deep
+    team_count = max(8, math.ceil(count * 5.5 / (ROSTER_SIZE * years)))
+    teams = league_teams(team_count)
+
+    names = unique_names(rng)
+    for _ in range(count):
+        name = next(names)
+        # More players in recent eras, like the real league's growth
+        start = FIRST_YEAR + int(years * (1 - rng.random() ** 1.6))
+        start = min(start, LAST_YEAR)
+        length = min(LAST_YEAR - start + 1, max(1, int(rng.expovariate(1 / 5.5)) + 1), 21)
+        team = rng.choice(teams)
+        seasons = []
+        for season in range(start, start + length):
+            if rng.random() < 0.18:
+                team = rng.choice(teams)
+            seasons.append({"team": team, "season": season})
+            if rng.random() < 0.06:
+                # Mid-season trade: two teams in the same season
+                traded = rng.choice(teams)
+                if traded != team:
+                    team = traded
+                    seasons.append({"team": team, "season": season})
+
+        player = {
+            "position": rng.choices(POSITIONS, POSITION_WEIGHTS)[0],
+            "start_year": start,
+            "career_length": length,
+            "seasons": seasons,
+            "teams": list(dict.fromkeys(s["team"] for s in seasons)),
+        }
+        if rng.random() < 0.85:
+            player["draft_year"] = start - 1
+
+        star = rng.random() < 0.06 and length >= 3
+        career = list(range(start, start + length))
+        player["all_star_seasons"] = sorted(rng.sample(career, rng.randint(1, min(length, 12)))) if star else []
+        selections = []
+        if star:
+            for season in player["all_star_seasons"]:
+                if rng.random() < 0.5:
+                    selections.append({"season": season, "type": rng.choice(ALL_TEAM_TYPES[:5])})
+        if rng.random() < 0.04:
+            selections.append({"season": start, "type": rng.choice(ALL_TEAM_TYPES[5:])})
+        player["all_team_selections"] = selections
+        player["awards_won"] = rng.sample(AWARDS, rng.randint(1, 2)) if star and rng.random() < 0.4 else []
+        yield name, player
+
+
+def write_database(path, count, seed=0):
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{")
+        for pid, (name, player) in enumerate(generate(count, seed)):
+            if pid:
+                f.write(",")
+            f.write(json.dumps(name, ensure_ascii=False))
+            f.write(":")
+            f.write(json.dumps(player, ensure_ascii=False, separators=(",", ":")))
+            written += 1
+        f.write("}")
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic players_awards.json")
+    parser.add_argument("--players", type=int, default=5000, help="e.g. 5000, 50000, 500000")
+    parser.add_argument("--out", default=None, help="default: players_<N>.json")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    out = args.out or f"players_{args.players}.json"
+    started = time.perf_counter()
+    count = write_database(out, args.players, args.seed)
+    print(f"✅ Wrote {count} players to {out} in {time.perf_counter() - started:.1f}s")
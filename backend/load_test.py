@@ -0,0 +1,288 @@
+"""Headless load generator that replays realistic game sessions.
+
+    python load_test.py --url http://127.0.0.1:5000 --players 2000 --duration 60
+
+Simulates many concurrent players on asyncio, sharing a pool of keep-alive
+HTTP/1.1 connections (stdlib only, so it runs anywhere the backend does).
+Each session loads the player list, picks a target the way play.py does,
+types into /api/suggest, guesses (with the occasional typo or unknown
+name) and ends by solving or revealing. Reports throughput, error rate and
+a latency histogram per endpoint.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from urllib.parse import quote, urlsplit
+
+from play import load_players, select_modern_players
+
+# Upper edges of the latency histogram buckets, in milliseconds
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf")]
+
+
+class HTTPConnection:
+    """Minimal keep-alive HTTP/1.1 client on asyncio streams"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=None):
+        reused = self.writer is not None
+        if not reused:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        headers = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                   "Accept-Encoding: gzip", "Connection: keep-alive"]
+        if body is not None:
+            headers += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+        try:
+            self.writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + (body or b""))
+            return await self._read_response()
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            self.close()
+            if reused:
+                # The server dropped an idle keep-alive connection; retry once on a fresh one
+                return await self.request(method, path, body)
+            raise
+
+    async def _read_response(self):
+        status_line = await self.reader.readuntil(b"\r\n")
+        status = int(status_line.split(b" ", 2)[1])
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                chunks.append(await self.reader.readexactly(size + 2))
+                if size == 0:
+                    break
+            body = b"".join(chunk[:-2] for chunk in chunks)
+        elif "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self.reader.read()
+            headers["connection"] = "close"
+
+        if headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, headers, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class ConnectionPool:
+    """Fixed set of connections, handed to waiting players first come, first served"""
+
+    def __init__(self, host, port, size):
+        self.idle = [HTTPConnection(host, port) for _ in range(size)]
+        self.waiters = deque()
+
+    async def acquire(self):
+        if self.idle:
+            return self.idle.pop()
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        return await waiter
+
+    def release(self, conn):
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(conn)
+                return
+        self.idle.append(conn)
+
+    def close(self):
+        for conn in self.idle:
+            conn.close()
+
+
+class EndpointStats:
+    def __init__(self):
+        self.samples = []
+        self.errors = 0
+        self.client_errors = 0
+        self.histogram = [0] * len(BUCKETS_MS)
+
+    def record(self, elapsed_ms, status):
+        self.samples.append(elapsed_ms)
+        for i, edge in enumerate(BUCKETS_MS):
+            if elapsed_ms <= edge:
+                self.histogram[i] += 1
+                break
+        if status is None or status >= 500:
+            self.errors += 1
+        elif status >= 400:
+            self.client_errors += 1
+
+    def percentile(self, fraction):
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class LoadTest:
+    def __init__(self, args, names, targets):
+        url = urlsplit(args.url)
+        self.pool = ConnectionPool(url.hostname, url.port or 80, args.connections)
+        self.args = args
+        self.names = names
+        self.targets = targets
+        self.stats = {}
+        self.sessions = 0
+        self.deadline = None
+
+    async def call(self, label, method, path, payload=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        conn = await self.pool.acquire()
+        # Timed from acquiring a connection, so pool queueing isn't counted as server latency
+        started = time.perf_counter()
+        try:
+            status, _, data = await conn.request(method, path, body)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            status, data = None, b""
+        finally:
+            self.pool.release(conn)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stats.setdefault(label, EndpointStats()).record(elapsed_ms, status)
+        return status, data
+
+    async def think(self, rng):
+        if self.args.think_time:
+            await asyncio.sleep(rng.expovariate(1 / self.args.think_time))
+
+    def guess_text(self, rng):
+        roll = rng.random()
+        name = rng.choice(self.names)
+        if roll < self.args.typo_rate:
+            # Drop or swap a letter, the way players misspell names
+            i = rng.randrange(1, max(2, len(name) - 1))
+            if rng.random() < 0.5:
+                return name[:i] + name[i + 1:]
+            return name[:i - 1] + name[i] + name[i - 1] + name[i + 1:]
+        if roll < self.args.typo_rate + self.args.unknown_rate:
+            return "".join(rng.choice("bcdfghjklmnpqrstvwxz") for _ in range(9))
+        return name
+
+    async def session(self, rng):
+        target = rng.choice(self.targets)
+        await self.call("GET /api/players", "GET", "/api/players")
+        for _ in range(rng.randint(self.args.min_guesses, self.args.max_guesses)):
+            if time.perf_counter() >= self.deadline:
+                return  # unfinished games don't count
+            guess = self.guess_text(rng)
+            if rng.random() < self.args.suggest_rate:
+                prefix = guess[:rng.randint(2, 5)]
+                await self.call("GET /api/suggest", "GET", f"/api/suggest?q={quote(prefix)}")
+            await self.think(rng)
+            await self.call("POST /api/guess", "POST", "/api/guess", {"guess": guess, "target": target})
+        if rng.random() < self.args.reveal_rate:
+            await self.call("POST /api/guess (reveal)", "POST", "/api/guess",
+                            {"guess": target, "target": target, "reveal": True})
+        else:
+            await self.call("POST /api/guess (win)", "POST", "/api/guess", {"guess": target, "target": target})
+        self.sessions += 1
+
+    async def player(self, seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < self.deadline:
+            await self.session(rng)
+
+    async def run(self):
+        self.deadline = time.perf_counter() + self.args.duration
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(self.player(self.args.seed * 1000003 + i) for i in range(self.args.players)))
+        finally:
+            self.pool.close()
+        return time.perf_counter() - started
+
+
+def report(test, elapsed):
+    total = sum(len(s.samples) for s in test.stats.values())
+    errors = sum(s.errors for s in test.stats.values())
+    print(f"\n{test.sessions} games, {total} requests in {elapsed:.1f}s "
+          f"→ {total / elapsed:.1f} req/s, error rate {errors / max(total, 1):.2%}\n")
+    print(f"{'endpoint':<28} {'requests':>9} {'req/s':>9} {'5xx/err':>8} {'4xx':>6} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    print("-" * 94)
+    for label, s in sorted(test.stats.items()):
+        print(f"{label:<28} {len(s.samples):>9} {len(s.samples) / elapsed:>9.1f} {s.errors:>8} "
+              f"{s.client_errors:>6} {s.percentile(0.5):>9.2f} {s.percentile(0.95):>9.2f} "
+              f"{s.percentile(0.99):>9.2f}")
+
+    print("\nLatency histogram (requests per bucket, ≤ ms)")
+    edges = ["≤" + ("inf" if edge == float("inf") else f"{edge:g}") for edge in BUCKETS_MS]
+    print(f"{'endpoint':<28} " + " ".join(f"{e:>7}" for e in edges))
+    for label, s in sorted(test.stats.items()):
+        print(f"{label:<28} " + " ".join(f"{count:>7}" for count in s.histogram))
+
+    return {
+        "games": test.sessions,
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(total / elapsed, 1),
+        "error_rate": round(errors / max(total, 1), 6),
+        "endpoints": {
+            label: {
+                "requests": len(s.samples),
+                "errors": s.errors,
+                "client_errors": s.client_errors,
+                "p50_ms": round(s.percentile(0.5), 3),
+                "p95_ms": round(s.percentile(0.95), 3),
+                "p99_ms": round(s.percentile(0.99), 3),
+                "histogram": dict(zip(edges, s.histogram)),
+            }
+            for label, s in test.stats.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay realistic game traffic against a local backend")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--db", default="players_awards.json", help="database the server is running")
+    parser.add_argument("--players", type=int, default=1000, help="concurrent simulated players")
+    parser.add_argument("--connections", type=int, default=64, help="keep-alive connections shared by players")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean seconds between guesses")
+    parser.add_argument("--min-guesses", type=int, default=5)
+    parser.add_argument("--max-guesses", type=int, default=25)
+    parser.add_argument("--typo-rate", type=float, default=0.1)
+    parser.add_argument("--unknown-rate", type=float, default=0.03)
+    parser.add_argument("--suggest-rate", type=float, default=0.5)
+    parser.add_argument("--reveal-rate", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_out", help="also write the report to this file")
+    args = parser.parse_args()
+
+    players_data = load_players(args.db)
+    names = list(players_data)
+    targets = select_modern_players(players_data) or names
+    print(f"🏀 {args.players} players over {args.connections} connections for {args.duration:g}s "
+          f"against {args.url} ({len(targets)} possible targets)")
+
+    test = LoadTest(args, names, targets)
+    elapsed = asyncio.run(test.run())
+    summary = report(test, elapsed)
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+from bisect import bisect_left
+
+# Seconds; covers a cached guess (~0.1ms) up to a cold full scan
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels, extra=()):
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_samples(name, kind, help_text, samples):
+    """Prometheus text for one metric family given [(labels, value)]"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{_labels(labels)} {_number(value)}" for labels, value in samples]
+    return "\n".join(lines) + "\n"
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+
+class Metrics:
+    """In-process counters and histograms, rendered in Prometheus text format.
+
+    Each gunicorn worker keeps its own numbers, so scrape every worker (or
+    sum across scrapes) to see the whole server.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.help = {}
+        self.counters = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def describe(self, name, kind, help_text):
+        self.help[name] = (kind, help_text)
+
+    def inc(self, name, labels=(), amount=1):
+        key = (name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, labels=()):
+        key = (name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.counts[bisect_left(self.buckets, value)] += 1
+            histogram.sum += value
+
+    def render(self):
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, list(h.counts), h.sum) for key, h in self.histograms.items())
+
+        families = {}
+        for (name, labels), value in counters:
+            families.setdefault(name, []).append(f"{name}{_labels(labels)} {_number(value)}")
+        for (name, labels), counts, total in histograms:
+            lines = families.setdefault(name, [])
+            cumulative = 0
+            for edge, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, (('le', _number(edge)),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+
+        out = []
+        for name in sorted(families):
+            kind, help_text = self.help.get(name, ("untyped", name))
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(families[name])
+        return "\n".join(out) + "\n"
+
+
+class ProfileCollector:
+    """Aggregates per-request cProfile runs over an on-demand time window"""
+
+    def __init__(self, output_dir=None):
+        self.output_dir = output_dir
+        self.until = 0.0
+        self.stats = None
+        self.requests = 0
+        self.started = None
+        self.lock = threading.Lock()
+
+    def start(self, seconds):
+        with self.lock:
+            self.until = time.time() + seconds
+            self.started = time.time()
+            self.stats = None
+            self.requests = 0
+        return self.until
+
+    def active(self):
+        return time.time() < self.until
+
+    def begin(self):
+        """A running profiler for this request, or None if no window is open"""
+        if not self.active():
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler already owns this interpreter (Python 3.12+)
+            return None
+        return profiler
+
+    def end(self, profiler):
+        profiler.disable()
+        with self.lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profiler)
+            else:
+                self.stats.add(profiler)
+            self.requests += 1
+
+    def report(self, limit=40, sort="cumulative"):
+        """Text report of the current window; also dumps a .prof file if configured"""
+        with self.lock:
+            if self.stats is None:
+                return None
+            out = io.StringIO()
+            self.stats.stream = out
+            out.write(f"{self.requests} requests profiled since {time.ctime(self.started)}"
+                      f"{' (still running)' if self.active() else ''}\n")
+            self.stats.sort_stats(sort).print_stats(limit)
+            if self.output_dir:
+                path = os.path.join(self.output_dir, f"profile-{os.getpid()}-{int(self.started)}.prof")
+                self.stats.dump_stats(path)
+                out.write(f"\nFull profile written to {path}\n")
+        return out.getvalue()
@@ -0,0 +1,162 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from difflib import get_close_matches
+from operator import itemgetter
+
+import numpy as np
+
+from score_cache import LRUCache
+
+PAD = "\x00"
+# Slack for float rounding in the filters; they only need to be conservative
+EPSILON = 1e-6
+
+
+def normalize_name(name):
+    """Casefold and strip diacritics, so "luka doncic" matches "Luka Dončić" """
+    decomposed = unicodedata.normalize("NFKD", name.strip().casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def search_key(name):
+    """Normalized name for prefix search: no punctuation, hyphens split words"""
+    key = re.sub(r"[.'’`]", "", normalize_name(name))
+    return " ".join(re.split(r"[\s\-]+", key)).strip()
+
+
+def bigrams(text):
+    padded = PAD + text + PAD
+    return Counter(padded[i:i + 2] for i in range(len(padded) - 1))
+
+
+class NameIndex:
+    """Exact and fuzzy player name lookup, built once per database.
+
+    Exact hits go through dicts: first on the lowercased name (what
+    get_player always did), then on the casefolded, diacritic-stripped name.
+
+    Fuzzy lookups return exactly what get_close_matches(query, names, n=1,
+    cutoff) would, but only rank a shortlist. The shortlist is built from a
+    padded character-bigram inverted index with a q-gram count filter: two
+    strings with SequenceMatcher ratio >= cutoff are within indel distance
+    d = (1 - cutoff) * (len(a) + len(b)), and every insertion or deletion
+    destroys at most two padded bigrams, so they must share at least
+    max(len(a), len(b)) + 1 - 2 * d bigrams. Anything below that bound can't
+    reach the cutoff and is never scored.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.lowered = {}
+        self.normalized = {}
+        for name in self.names:
+            self.lowered.setdefault(name.lower(), name)
+            self.normalized.setdefault(normalize_name(name), name)
+
+        postings = {}
+        for i, name in enumerate(self.names):
+            for gram, count in bigrams(name).items():
+                postings.setdefault(gram, []).append((i, count))
+        self.postings = {
+            gram: (np.asarray([i for i, _ in entries], dtype=np.int32),
+                   np.asarray([c for _, c in entries], dtype=np.int32))
+            for gram, entries in postings.items()
+        }
+        self.lengths = np.asarray([len(name) for name in self.names], dtype=np.int64)
+
+    def exact(self, name):
+        name = name.strip()
+        match = self.lowered.get(name.lower())
+        if match is None:
+            match = self.normalized.get(normalize_name(name))
+        return match
+
+    def shortlist(self, query, cutoff=0.8):
+        """Names that could possibly reach `cutoff` against `query`"""
+        ids = []
+        weights = []
+        for gram, count in bigrams(query).items():
+            entry = self.postings.get(gram)
+            if entry is not None:
+                ids.append(entry[0])
+                weights.append(np.minimum(entry[1], count))
+        if not ids:
+            return []
+        shared = np.bincount(np.concatenate(ids), weights=np.concatenate(weights),
+                             minlength=len(self.names))
+
+        query_len = len(query)
+        total = self.lengths + query_len
+        max_edits = np.floor((1 - cutoff) * total + EPSILON)
+        needed = np.maximum(self.lengths, query_len) + 1 - 2 * max_edits
+        # Same length check as SequenceMatcher.real_quick_ratio()
+        length_ok = 2.0 * np.minimum(self.lengths, query_len) >= (cutoff - EPSILON) * total
+        return [self.names[i] for i in np.flatnonzero(length_ok & (shared >= needed))]
+
+    def fuzzy(self, name, cutoff=0.8):
+        query = name.strip().lower()
+        close = get_close_matches(query, self.shortlist(query, cutoff), n=1, cutoff=cutoff)
+        return close[0] if close else None
+
+    def lookup(self, name, cutoff=0.8):
+        match = self.exact(name)
+        if match is None:
+            match = self.fuzzy(name, cutoff)
+        return match
+
+
+# Suggestion match quality, best first
+FULL_EXACT, FULL_PREFIX, TOKEN_EXACT, TOKEN_PREFIX = range(4)
+
+
+class SuggestIndex:
+    """Prefix autocomplete over normalized full names and each name token.
+
+    Terms live in one sorted array and a prefix query is a bisect to the
+    first match followed by a scan over the matching run. Results are
+    ranked by match quality, then shorter names, then alphabetically.
+    """
+
+    def __init__(self, names, cache_size=4096):
+        self.names = list(names)
+        entries = []
+        for i, name in enumerate(self.names):
+            key = search_key(name)
+            entries.append((key, i, True))
+            tokens = key.split(" ")
+            if len(tokens) > 1:
+                entries.extend((token, i, False) for token in set(tokens) if token)
+        # Entries are generated in id order, so a stable sort on the term alone
+        # gives the (term, id) order without comparing tuples
+        entries.sort(key=itemgetter(0))
+        self.terms = [term for term, _, _ in entries]
+        self.ids = [i for _, i, _ in entries]
+        self.full = [full for _, _, full in entries]
+        # Not functools.lru_cache on the bound method: that makes the index
+        # reference itself, and a replaced database would wait for the cycle collector
+        self.cache = LRUCache(cache_size)
+
+    def suggest(self, query, limit=10):
+        return self.cache.get_or_compute((query, limit), lambda: self._suggest(query, limit))
+
+    def _suggest(self, query, limit):
+        query = search_key(query)
+        if not query:
+            return ()
+        best = {}
+        terms = self.terms
+        i = bisect_left(terms, query)
+        while i < len(terms) and terms[i].startswith(query):
+            exact = len(terms[i]) == len(query)
+            if self.full[i]:
+                quality = FULL_EXACT if exact else FULL_PREFIX
+            else:
+                quality = TOKEN_EXACT if exact else TOKEN_PREFIX
+            name_id = self.ids[i]
+            if quality < best.get(name_id, TOKEN_PREFIX + 1):
+                best[name_id] = quality
+            i += 1
+        ranked = sorted(best, key=lambda n: (best[n], len(self.names[n]), self.names[n]))
+        return tuple(self.names[n] for n in ranked[:limit])
@@ -0,0 +1,83 @@
+"""ASGI entry point that runs top-5 scans in a pool of worker processes.
+
+    uvicorn nba_mantle_asgi:application --host 0.0.0.0 --port 5000
+
+The Flask app serves every request as it does under WSGI, on a pool of
+REQUEST_THREADS threads, and single-pair scoring stays inline. Uncached
+top-n scans (wins and reveals) go to SCAN_POOL_SIZE worker processes that
+each load the player database at startup. The request thread awaits the
+result on the server's event loop without holding the GIL, so the guesses
+queued behind a reveal keep being served. A scan taking longer than
+SCAN_TIMEOUT seconds answers 503. SCAN_POOL_SIZE=0 scans inline.
+Admission control (ADMIT_* in nba_mantle_backend.py) applies as under WSGI.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+import nba_mantle_backend as backend
+from scan_pool import ScanPool
+
+SCAN_POOL_SIZE = int(os.environ.get('SCAN_POOL_SIZE', 2))
+SCAN_TIMEOUT = float(os.environ.get('SCAN_TIMEOUT', 10))
+# Requests waiting for admission hold a thread, so by default there is one for
+# each admitted or queued request plus a few for unlimited endpoints
+REQUEST_THREADS = int(os.environ.get('REQUEST_THREADS', backend.ADMIT_CONCURRENCY + backend.ADMIT_QUEUE + 8
+                                     if backend.admission is not None else 16))
+
+request_threads = ThreadPoolExecutor(REQUEST_THREADS, thread_name_prefix='request')
+
+
+class ThreadedWsgiToAsgiInstance(WsgiToAsgiInstance):
+    # asgiref runs every WSGI request on one shared thread, so a request
+    # waiting on a scan would hold up all the others
+    run_wsgi_app = sync_to_async(WsgiToAsgiInstance.run_wsgi_app.__wrapped__,
+                                 thread_sensitive=False, executor=request_threads)
+
+
+class ThreadedWsgiToAsgi(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        await ThreadedWsgiToAsgiInstance(self.wsgi_application, self.duplicate_header_limit)(
+            scope, receive, send)
+
+
+flask_application = ThreadedWsgiToAsgi(backend.app)
+scan_pool = None
+if SCAN_POOL_SIZE > 0:
+    scan_pool = ScanPool(SCAN_POOL_SIZE, SCAN_TIMEOUT, backend.database_load_args(),
+                         backend.SCORING_PROFILES_PATH)
+
+    def offload_scan(version, target_key, n, scoring):
+        # Called on a request thread; awaits the pool on the server's event loop
+        return async_to_sync(scan_pool.top_n)(version, target_key, n, scoring)
+
+    backend.offload_scan = offload_scan
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+    else:
+        await flask_application(scope, receive, send)
+
+
+async def lifespan(receive, send):
+    """Start the scan workers before taking traffic and stop them on shutdown"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                if scan_pool is not None:
+                    await scan_pool.start()
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if scan_pool is not None:
+                scan_pool.close()
+            request_threads.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
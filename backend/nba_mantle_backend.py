@@ -1,157 +1,314 @@
-from flask import Flask, request, jsonify, send_from_directory, send_file
+from flask import Flask, Response, abort, g, has_request_context, request, jsonify
 from flask_cors import CORS
-from difflib import get_close_matches
-import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import date, datetime, timezone
+import hmac
 import os
-
-app = Flask(__name__, static_folder='build', static_url_path='')
+import threading
+import time
+
+from player_features import CompiledPlayer
+from player_database import FileWatcher, PlayerDatabase, release_free_memory
+from scoring_profiles import CLASSIC, load_profiles
+from candidate_search import top_n_pruned
+from score_cache import LRUCache
+from payloads import EncodedPayload, payload_response
+from player_snapshot import default_snapshot_path
+from game_stats import GameStats
+from metrics import Metrics, ProfileCollector, render_samples
+from daily_puzzle import TargetRanking, load_puzzle_overrides
+from neighbor_index import default_index_path, players_above, score_histogram
+from scan_pool import ScanTimeout
+from static_assets import StaticAssets, asset_response
+from session_store import SessionStore
+from target_index import TargetIndex
+from admission import AdmissionControl, Overloaded, RateLimiter, retry_after_header
+
+# The React build is served by serve() from a manifest, not Flask's static route
+app = Flask(__name__, static_folder=None)
 CORS(app)  # Enable CORS for all routes
 
+PLAYERS_DB_PATH = os.environ.get('PLAYERS_DB_PATH', 'players_awards.json')
+PLAYERS_SNAPSHOT_PATH = os.environ.get('PLAYERS_SNAPSHOT_PATH', default_snapshot_path(PLAYERS_DB_PATH))
+NEIGHBOR_INDEX_PATH = os.environ.get('NEIGHBOR_INDEX_PATH', default_index_path(PLAYERS_DB_PATH))
+SCORE_CACHE_SIZE = int(os.environ.get('SCORE_CACHE_SIZE', 100000))
+TOP_CACHE_SIZE = int(os.environ.get('TOP_CACHE_SIZE', 4096))
+PAYLOAD_MAX_AGE = int(os.environ.get('PAYLOAD_MAX_AGE', 300))
+BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 5000))
+RANKING_CACHE_SIZE = int(os.environ.get('RANKING_CACHE_SIZE', 64))
+PUZZLE_EPOCH = date.fromisoformat(os.environ.get('PUZZLE_EPOCH', '2025-06-01'))
+PUZZLE_SALT = os.environ.get('PUZZLE_SALT', 'nba-mantle')
+PUZZLE_OVERRIDES_PATH = os.environ.get('PUZZLE_OVERRIDES_PATH', 'daily_puzzles.json')
+STATS_DB_PATH = os.environ.get('STATS_DB_PATH', 'game_stats.sqlite3')
+STATS_FLUSH_INTERVAL = float(os.environ.get('STATS_FLUSH_INTERVAL', 5))
+SCORING_PROFILES_PATH = os.environ.get('SCORING_PROFILES_PATH', 'scoring_profiles.json')
+DEFAULT_SCORING_PROFILE = os.environ.get('SCORING_PROFILE', 'classic')
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '').lower() in ('1', 'true', 'yes')
+METRICS_PROFILE_DIR = os.environ.get('METRICS_PROFILE_DIR')
+# Seconds between checks of the database files for changes; 0 disables the watcher
+DB_RELOAD_INTERVAL = float(os.environ.get('DB_RELOAD_INTERVAL', 0))
+# Enables POST /api/admin/reload for requests sending it as X-Admin-Token
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+# Game sessions (POST /api/game) live this many seconds; at most SESSION_MAX per
+# worker are held in memory, saved every STATS_FLUSH_INTERVAL seconds to a SQLite
+# file so games outlive eviction and restarts. Route each game to one worker
+SESSION_TTL = float(os.environ.get('SESSION_TTL', 6 * 3600))
+SESSION_MAX = int(os.environ.get('SESSION_MAX', 100000))
+SESSION_DB_PATH = os.environ.get('SESSION_DB_PATH', STATS_DB_PATH)
+# Background top-5 computations for new games; more waiting than this are skipped
+PREFETCH_THREADS = int(os.environ.get('PREFETCH_THREADS', 2))
+PREFETCH_QUEUE = int(os.environ.get('PREFETCH_QUEUE', 64))
+# The React build; the backend's deploy runs static_assets.py on it to precompress the bundles
+STATIC_DIR = os.environ.get('STATIC_DIR', os.path.join(app.root_path, 'build'))
+# Admission control: requests running at once per worker (0 disables), of which
+# at most ADMIT_SCANS top-n scans and ADMIT_BULK full-database downloads, and how
+# many may wait, for how long, before getting a 503. Scans hold the GIL, so a
+# second one at a time adds little throughput and mostly delays guesses
+ADMIT_CONCURRENCY = int(os.environ.get('ADMIT_CONCURRENCY', 8))
+ADMIT_SCANS = int(os.environ.get('ADMIT_SCANS', 1))
+ADMIT_BULK = int(os.environ.get('ADMIT_BULK', 2))
+ADMIT_QUEUE = int(os.environ.get('ADMIT_QUEUE', 32))
+ADMIT_MAX_WAIT = float(os.environ.get('ADMIT_MAX_WAIT', 2))
+# Per-client rate limit in tokens a second, up to RATE_BURST banked; off unless set.
+# Clients are keyed by address, so behind a proxy also set RATE_LIMIT_TRUST_PROXY
+# to key them by X-Forwarded-For, or every player shares the proxy's bucket
+RATE_LIMIT = float(os.environ.get('RATE_LIMIT', 0))
+RATE_BURST = float(os.environ.get('RATE_BURST', 60))
+RATE_LIMIT_CLIENTS = int(os.environ.get('RATE_LIMIT_CLIENTS', 100000))
+RATE_LIMIT_TRUST_PROXY = os.environ.get('RATE_LIMIT_TRUST_PROXY', '').lower() in ('1', 'true', 'yes')
+
 # Load players database
-def load_players_db():
-    try:
-        with open('players_awards.json', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        print("Warning: players_awards.json not found. Using empty database.")
-        return {}
-
-players_db = load_players_db()
-guess_counter = {}
-
-def compute_similarity(player1, player2, name1=None, name2=None):
-    score = 0
-    breakdown = {}
-
-    # Shared seasons
-    p1_seasons = set((s["team"], s["season"]) for s in player1.get("seasons", []))
-    p2_seasons = set((s["team"], s["season"]) for s in player2.get("seasons", []))
-    shared_seasons = sorted(p1_seasons & p2_seasons, key=lambda x: x[1])
-    shared_season_count = len(shared_seasons)
-
-    consecutive_bonus = 0
-    if shared_season_count >= 2:
-        years = [s for _, s in shared_seasons]
-        streak = 1
-        max_streak = 1
-        for i in range(1, len(years)):
-            if years[i] == years[i-1] + 1:
-                streak += 1
-                max_streak = max(max_streak, streak)
-            else:
-                streak = 1
-        consecutive_bonus = min(max_streak * 2, 10)
-
-    if shared_season_count >= 6:
-        pts = 50
-    elif shared_season_count >= 4:
-        pts = 40
-    elif shared_season_count >= 2:
-        pts = 30
-    elif shared_season_count == 1:
-        pts = 20
-    else:
-        pts = 0
-
-    score += pts + consecutive_bonus
-    breakdown["shared_seasons"] = pts
-    breakdown["shared_streak_bonus"] = consecutive_bonus
-
-    # Teammate years
-    teammate_years = player1.get("teammate_years", {}).get(name2, 0)
-    if teammate_years >= 6:
-        pts = 15
-    elif teammate_years >= 4:
-        pts = 10
-    elif teammate_years >= 2:
-        pts = 6
-    elif teammate_years == 1:
-        pts = 3
-    else:
-        pts = 0
-    score += pts
-    breakdown["teammate_years"] = pts
-
-    # Shared franchises
-    overlap_teams = set(player1.get("teams", [])) & set(player2.get("teams", []))
-    team_pts = len(overlap_teams) * 2
-    score += team_pts
-    breakdown["shared_teams"] = team_pts
-
-    # Tenure overlap
-    tenure_bonus = 0
-    for team in overlap_teams:
-        p1_years = {s["season"] for s in player1["seasons"] if s["team"] == team}
-        p2_years = {s["season"] for s in player2["seasons"] if s["team"] == team}
-        overlap = len(p1_years & p2_years)
-        tenure_bonus += min(overlap, 3)
-    score += tenure_bonus
-    breakdown["team_tenure"] = tenure_bonus
-
-    # Position match
-    p1_pos = player1.get("position", "")
-    p2_pos = player2.get("position", "")
-    if p1_pos == p2_pos:
-        pts = 8
-    elif p1_pos[:2] == p2_pos[:2]:
-        pts = 2
-    else:
-        pts = 0
-    score += pts
-    breakdown["position_match"] = pts
-
-    # Start year (era proximity with exact match bonus)
-    start1 = player1.get("start_year", 0)
-    start2 = player2.get("start_year", 0)
-    era_diff = abs(start1 - start2)
-
-    if era_diff == 0:
-        era_pts = 6  # Big bonus for same start year
-    elif era_diff <= 5:
-        era_pts = 4
-    elif era_diff <= 10:
-        era_pts = 2
-    else:
-        era_pts = 0
-
-    score += era_pts
-    breakdown["start_year_diff"] = era_pts
-
-    # All-Star (once)
-    if set(player1.get("all_star_seasons", [])) & set(player2.get("all_star_seasons", [])):
-        score += 3
-        breakdown["shared_all_star"] = 3
-
-    # All-NBA/Defense/Rookie team (once)
-    found_team = False
-    for sel1 in player1.get("all_team_selections", []):
-        for sel2 in player2.get("all_team_selections", []):
-            if sel1["season"] == sel2["season"] and sel1["type"] == sel2["type"]:
-                found_team = True
-                break
-        if found_team:
-            break
-    if found_team:
-        score += 3
-        breakdown["shared_all_team"] = 3
-
-    # Shared award winners (once)
-    if set(player1.get("awards_won", [])) & set(player2.get("awards_won", [])):
-        score += 5
-        breakdown["shared_awards"] = 5
-
-    breakdown["total"] = min(score, 99)
-    return breakdown["total"], breakdown
+def database_load_args():
+    """PlayerDatabase.load's arguments for the configured files"""
+    return (PLAYERS_DB_PATH, PLAYERS_SNAPSHOT_PATH, NEIGHBOR_INDEX_PATH,
+            PUZZLE_EPOCH, PUZZLE_SALT, load_puzzle_overrides(PUZZLE_OVERRIDES_PATH))
+
+def load_database():
+    """Load the database files and build everything derived from them"""
+    return PlayerDatabase.load(*database_load_args())
+
+# Watch before loading, so a file replaced mid-load is picked up afterwards
+watcher = None
+if DB_RELOAD_INTERVAL > 0:
+    watcher = FileWatcher((PLAYERS_DB_PATH, PLAYERS_SNAPSHOT_PATH, NEIGHBOR_INDEX_PATH, PUZZLE_OVERRIDES_PATH),
+                          DB_RELOAD_INTERVAL, lambda: reload_database())
+# The active database. Reloads replace it whole; see current_database()
+database = load_database()
+reload_lock = threading.Lock()
+scoring_profiles = load_profiles(SCORING_PROFILES_PATH)
+default_scoring = scoring_profiles.get(DEFAULT_SCORING_PROFILE)
+if default_scoring is None:
+    print(f"Warning: unknown scoring profile {DEFAULT_SCORING_PROFILE!r}. Using classic.")
+    default_scoring = CLASSIC
+score_cache = LRUCache(SCORE_CACHE_SIZE, database.version)
+top_cache = LRUCache(TOP_CACHE_SIZE, database.version)
+ranking_cache = LRUCache(RANKING_CACHE_SIZE, database.version)
+# Keyed by database version, so a reload builds a new one
+target_indexes = LRUCache(2)
+game_stats = GameStats(STATS_DB_PATH, STATS_FLUSH_INTERVAL)
+static_assets = StaticAssets(STATIC_DIR)
+game_sessions = SessionStore(SESSION_MAX, SESSION_TTL, SESSION_DB_PATH, STATS_FLUSH_INTERVAL)
+prefetch_pool = ThreadPoolExecutor(PREFETCH_THREADS, thread_name_prefix='prefetch')
+prefetch_slots = threading.BoundedSemaphore(PREFETCH_QUEUE)
+# Request classes in priority order: single guesses and lookups, anything
+# scanning every player, and full player list downloads
+admission = AdmissionControl(ADMIT_CONCURRENCY, {'guess': ADMIT_CONCURRENCY, 'scan': ADMIT_SCANS, 'bulk': ADMIT_BULK},
+                             ADMIT_QUEUE, ADMIT_MAX_WAIT) if ADMIT_CONCURRENCY > 0 else None
+rate_limiter = RateLimiter(RATE_LIMIT, RATE_BURST, RATE_LIMIT_CLIENTS) if RATE_LIMIT > 0 else None
+# Set by the ASGI entry point (nba_mantle_asgi.py) to run top-n scans in its
+# process pool: offload_scan(version, target_key, n, scoring) returns the
+# top n, or None to scan here instead
+offload_scan = None
+
+# Instrumentation is off unless METRICS_ENABLED is set; when off, `metrics`
+# is None and no request hooks are installed
+metrics = Metrics() if METRICS_ENABLED else None
+profiler = ProfileCollector(METRICS_PROFILE_DIR) if METRICS_ENABLED else None
+if metrics is not None:
+    metrics.describe('nba_mantle_request_duration_seconds', 'histogram', 'Request latency by endpoint')
+    metrics.describe('nba_mantle_requests_total', 'counter', 'Requests by endpoint and status')
+    metrics.describe('nba_mantle_player_lookups_total', 'counter',
+                     'get_player results: exact hit, fuzzy fallback hit, or miss')
+    metrics.describe('nba_mantle_player_lookup_duration_seconds', 'histogram', 'get_player latency by result')
+    metrics.describe('nba_mantle_top_similar_duration_seconds', 'histogram',
+                     'Uncached top-5 computation time by source (ranking, neighbor_index, scan_pool, pruned, full_scan)')
+    metrics.describe('nba_mantle_similarity_component_seconds_total', 'counter',
+                     'Time spent computing each compute_similarity feature, plus the points step')
+    metrics.describe('nba_mantle_similarity_calls_total', 'counter', 'compute_similarity calls')
+
+def current_database():
+    """The database this request started with, or the active one outside a request.
+
+    A request pins the database on first use, so a reload swapping in a new
+    one never changes the data under a request that is already running.
+    """
+    if not has_request_context():
+        return database
+    db = g.get('database')
+    if db is None:
+        db = g.database = database
+    return db
+
+def reload_database():
+    """Load the database files again and atomically swap them in.
+
+    Runs on the calling thread (the watcher, or an admin request), not on
+    any game request's. The new database and its whole-database payloads
+    are fully built before the swap; requests already running finish on the
+    old one, which is freed when they do.
+    """
+    global database
+    with reload_lock:
+        started = time.perf_counter()
+        new = load_database()
+        encoded_payload('players', lambda: list(new.players.keys()), new)
+        encoded_payload('players_data', lambda: create_players_summary(new), new)
+        target_index(new)
+        previous_version, database = database.version, new
+        for cache in (score_cache, top_cache, ranking_cache):
+            cache.reset(new.version)
+    # The old database is freed once the last request pinning it finishes;
+    # its pages stay mapped in the allocator unless handed back
+    release_free_memory()
+    print(f"Reloaded player database {previous_version} -> {new.version} "
+          f"({len(new.players)} players) in {time.perf_counter() - started:.1f}s")
+    return new
+
+def compiled_player(player, name=None, db=None):
+    """Return the load-time compiled features for a database player.
+
+    Names identify database players; pass name=None to score a player dict
+    that isn't in the database.
+    """
+    db = db or current_database()
+    compiled = db.compiled.get(name)
+    if compiled is None:
+        compiled = CompiledPlayer(player, db.team_codes)
+    return compiled
+
+def compute_similarity(player1, player2, name1=None, name2=None, scoring=None):
+    scoring = scoring or default_scoring
+    db = current_database()
+    if metrics is not None:
+        return _compute_similarity_timed(
+            compiled_player(player1, name1, db), compiled_player(player2, name2, db), scoring)
+    return scoring.score(compiled_player(player1, name1, db), compiled_player(player2, name2, db))
+
+def _compute_similarity_timed(player1, player2, scoring):
+    timings = {}
+    result = scoring.score_timed(player1, player2, timings, time.perf_counter)
+    for component, seconds in timings.items():
+        metrics.inc('nba_mantle_similarity_component_seconds_total', (('component', component),), seconds)
+    metrics.inc('nba_mantle_similarity_calls_total')
+    return result
+
+def pair_score(guess_key, target_key, scoring=None):
+    """Cached compute_similarity for two players already in the database"""
+    scoring = scoring or default_scoring
+    db = current_database()
+    return score_cache.get_or_compute(
+        (guess_key, target_key, scoring.name),
+        lambda: compute_similarity(db.players[guess_key], db.players[target_key], guess_key, target_key, scoring),
+        db.version)
+
+def top_similar(target_key, n=5, scoring=None):
+    """Cached top-n for a target; concurrent reveals of one target share a single scan"""
+    scoring = scoring or default_scoring
+    db = current_database()
+    return top_cache.get_or_compute(
+        (target_key, n, scoring.name), lambda: _top_similar(target_key, n, scoring, db), db.version)
+
+def target_ranking(target_key):
+    """Full ranking of every player against the target under the default profile, computed once per target"""
+    db = current_database()
+    return ranking_cache.get_or_compute(
+        target_key, lambda: TargetRanking(db.engine, target_key, default_scoring), db.version)
+
+def _top_similar(target_key, n, scoring, db):
+    if metrics is None:
+        return _find_top_similar(target_key, n, scoring, db)[1]
+    started = time.perf_counter()
+    source, top = _find_top_similar(target_key, n, scoring, db)
+    metrics.observe('nba_mantle_top_similar_duration_seconds', time.perf_counter() - started,
+                    (('source', source),))
+    return top
+
+def _find_top_similar(target_key, n, scoring, db):
+    """Most similar players to the target, from a precomputed ranking or index when available"""
+    if scoring is default_scoring:
+        ranking = ranking_cache.peek(target_key, db.version)
+        if ranking is not None and n < len(ranking):
+            return 'ranking', ranking.top(n)
+    if indexed(scoring, db):
+        top = db.neighbor_index.top(target_key, n)
+        if top is not None:
+            return 'neighbor_index', top
+    with scan_slot():
+        if offload_scan is not None:
+            top = offload_scan(db.version, target_key, n, scoring)
+            if top is not None:
+                return 'scan_pool', top
+        top = top_n_pruned(db.engine, target_key, n, scoring)
+        if top is not None:
+            return 'pruned', top
+        return 'full_scan', db.engine.top_n(target_key, n, scoring)
+
+def scan_slot():
+    """Admission for an uncached scan within a request admitted as something cheaper, e.g. a winning guess"""
+    if admission is None or not has_request_context() or g.get('admission_class') in (None, 'scan'):
+        return nullcontext()
+    return admission.slot('scan', nested=True)
+
+def indexed(scoring, db):
+    """Whether the database's neighbor index was built with exactly this profile"""
+    return db.neighbor_index is not None and db.neighbor_index.profile_fingerprint == scoring.fingerprint
+
+def score_distribution(target_key, scoring=None):
+    """Histogram of every other player's score against the target"""
+    scoring = scoring or default_scoring
+    db = current_database()
+    if indexed(scoring, db):
+        histogram = db.neighbor_index.histogram(target_key)
+        if histogram is not None:
+            return histogram
+    scores = db.engine.score_all(target_key, scoring)
+    return score_histogram(scores, db.engine.index[target_key]).tolist()
+
+def requested_scoring(data=None):
+    """Scoring profile named by ?profile= or a JSON "profile" field; None if unknown"""
+    name = request.args.get('profile') or (data or {}).get('profile')
+    if not name:
+        return default_scoring
+    return scoring_profiles.get(name) if isinstance(name, str) else None
+
+def unknown_profile():
+    return jsonify({"error": "Unknown scoring profile.", "profiles": list(scoring_profiles)}), 400
 
 def get_player(name):
-    name = name.strip().lower()
-    for player in players_db:
-        if player.lower() == name:
-            return players_db[player], player
-    close = get_close_matches(name, players_db.keys(), n=1, cutoff=0.8)
-    if close:
-        return players_db[close[0]], close[0]
-    return None, None
+    if not isinstance(name, str):
+        return None, None
+    db = current_database()
+    if metrics is not None:
+        matched = _lookup_player_timed(name, db.name_index)
+    else:
+        matched = db.name_index.lookup(name, cutoff=0.8)
+    if matched is None:
+        return None, None
+    return db.players[matched], matched
+
+def _lookup_player_timed(name, name_index):
+    """name_index.lookup, recording whether the exact or fuzzy path answered"""
+    started = time.perf_counter()
+    matched = name_index.exact(name)
+    result = 'exact'
+    if matched is None:
+        matched = name_index.fuzzy(name, cutoff=0.8)
+        result = 'fuzzy' if matched is not None else 'miss'
+    labels = (('result', result),)
+    metrics.observe('nba_mantle_player_lookup_duration_seconds', time.perf_counter() - started, labels)
+    metrics.inc('nba_mantle_player_lookups_total', labels)
+    return matched
 
 def calculate_career_length(player_data):
     """Calculate career length from existing data or seasons data as fallback"""
@@ -187,11 +344,11 @@ def get_draft_year(player_data):
     
     return 0
 
-def create_players_summary():
+def create_players_summary(db=None):
     """Create a summary of all players with filtering data"""
     summary = {}
     
-    for player_name, player_data in players_db.items():
+    for player_name, player_data in (db or current_database()).players.items():
         summary[player_name] = {
             "start_year": player_data.get("start_year", 0),
             "draft_year": get_draft_year(player_data),
@@ -203,36 +360,206 @@ def create_players_summary():
     
     return summary
 
+def target_index(db=None):
+    """Sorted and bitmap indexes over the summary fields, built once per database"""
+    db = db or current_database()
+    return target_indexes.get_or_compute(db.version, lambda: TargetIndex(create_players_summary(db)))
+
+def target_filters(params):
+    """TargetIndex.match arguments from query args or a JSON body; ValueError if malformed"""
+    ranges = []
+    for field in ('start_year', 'career_length'):
+        low, high = params.get(f'{field}_min'), params.get(f'{field}_max')
+        try:
+            low = None if low in (None, '') else int(low)
+            high = None if high in (None, '') else int(high)
+        except TypeError:
+            # e.g. a list or object in a JSON body
+            raise ValueError(f"{field} filters must be integers")
+        if low is not None or high is not None:
+            ranges.append((field, low, high))
+    sets = []
+    for field in ('position', 'team'):
+        raw = params.getlist(field) if hasattr(params, 'getlist') else params.get(field)
+        if isinstance(raw, str):
+            raw = [raw]
+        elif raw is not None and not isinstance(raw, list):
+            raise ValueError(f"{field} must be a string or a list of strings")
+        values = {v.strip().upper() for item in raw or () for v in str(item).split(',') if v.strip()}
+        if values:
+            sets.append((field, values))
+    return ranges, sets
+
+def choose_target(params):
+    """(name, number of matching players) for a random player matching the filters in params"""
+    index = target_index()
+    ids = index.match(*target_filters(params))
+    return index.sample(ids), len(ids)
+
+if watcher is not None:
+    @app.before_request
+    def start_database_watcher():
+        watcher.ensure_started()
+
+if metrics is not None:
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        g.request_profile = profiler.begin()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            labels = (('endpoint', endpoint), ('method', request.method))
+            metrics.observe('nba_mantle_request_duration_seconds', time.perf_counter() - started, labels)
+            metrics.inc('nba_mantle_requests_total', labels + (('status', response.status_code),))
+        profile = g.pop('request_profile', None)
+        if profile is not None:
+            profiler.end(profile)
+        return response
+
+# Admission class and rate-limit cost of each endpoint. Unlisted ones (health,
+# stats, metrics, admin, static files) are neither limited nor counted
+ENDPOINT_COSTS = {
+    'guess': ('guess', 1),
+    'game_guess': ('guess', 1),
+    'puzzle_guess': ('guess', 1),
+    'suggest_players': ('guess', 1),
+    'random_target': ('guess', 1),
+    'create_game': ('guess', 1),
+    'get_single_player': ('guess', 1),
+    'get_todays_puzzle': ('guess', 1),
+    'game_reveal': ('scan', 2),
+    'puzzle_reveal': ('scan', 2),
+    'get_player_difficulty': ('scan', 2),
+    'guess_batch': ('scan', 5),
+    'get_players': ('bulk', 5),
+    'get_player_awards': ('bulk', 5),
+    'get_players_data': ('bulk', 10),
+}
+
+def client_id():
+    """Rate-limit key: the client's address, as seen by our proxy when trusting one"""
+    if RATE_LIMIT_TRUST_PROXY and request.access_route:
+        # The last hop is the one the proxy added; earlier ones are the client's say-so
+        return request.access_route[-1]
+    return request.remote_addr or ''
+
+if admission is not None or rate_limiter is not None:
+    @app.before_request
+    def admit_request():
+        cost = ENDPOINT_COSTS.get(request.endpoint)
+        if cost is None:
+            return None
+        request_class, tokens = cost
+        if rate_limiter is not None:
+            wait = rate_limiter.take(client_id(), tokens)
+            if wait:
+                return (jsonify({"error": "Too many requests. Slow down."}), 429,
+                        {'Retry-After': retry_after_header(wait)})
+        if admission is not None:
+            admission.acquire(request_class)
+            g.admission_class = request_class
+        return None
+
+    @app.teardown_request
+    def release_admission(exc):
+        request_class = g.pop('admission_class', None)
+        if request_class is not None:
+            admission.release(request_class)
+
+@app.errorhandler(Overloaded)
+def overloaded(e):
+    return jsonify({"error": "The server is busy. Try again shortly."}), 503, {'Retry-After': retry_after_header(e.retry_after)}
+
+@app.errorhandler(ScanTimeout)
+def scan_timed_out(e):
+    print(f"Warning: {e}")
+    return jsonify({"error": "The server is busy. Try again shortly."}), 503, {'Retry-After': '1'}
+
 # Serve React App
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    if path != "" and os.path.exists(app.static_folder + '/' + path):
-        return send_from_directory(app.static_folder, path)
-    else:
-        return send_from_directory(app.static_folder, 'index.html')
+    # Unknown paths get the app shell, as React handles its own routes
+    asset = static_assets.get(path) or static_assets.get('index.html')
+    if asset is None:
+        abort(404)
+    return asset_response(asset, request)
 
 # API Routes
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'Server is running', 'players_loaded': len(players_db)})
+    db = current_database()
+    return jsonify({
+        'status': 'Server is running',
+        'players_loaded': len(db.players),
+        'db_version': db.version,
+        'db_loaded_at': datetime.fromtimestamp(db.loaded_at, timezone.utc).isoformat(timespec='seconds'),
+        'neighbor_index': db.neighbor_index is not None,
+        'scoring_profile': default_scoring.name
+    })
+
+@app.route('/api/admin/reload', methods=['POST'])
+def admin_reload():
+    """Reload the player database files in this worker and swap them in"""
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "Reloading over HTTP is disabled. Set ADMIN_TOKEN."}), 404
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({"error": "Invalid admin token."}), 403
+    if reload_lock.locked():
+        return jsonify({"error": "A reload is already in progress."}), 409
+    # Read without pinning, so this request doesn't keep the old database alive
+    previous_version = database.version
+    try:
+        db = reload_database()
+    except Exception as e:
+        return jsonify({"error": f"Reload failed, still serving {previous_version}: {e}"}), 500
+    return jsonify({
+        "previous_version": previous_version,
+        "db_version": db.version,
+        "players_loaded": len(db.players),
+        "pid": os.getpid()
+    })
+
+def encoded_payload(name, build, db=None):
+    """Build a large response body once per database version"""
+    return (db or current_database()).payloads.get_or_compute(
+        name, lambda: EncodedPayload.from_json(app, build()))
+
+def player_names():
+    db = current_database()
+    return encoded_payload('players', lambda: list(db.players.keys()), db)
 
 @app.route('/api/players', methods=['GET'])
 def get_players():
     """Return list of all player names"""
-    return jsonify(list(players_db.keys()))
+    return payload_response(player_names(), request, PAYLOAD_MAX_AGE)
 
 @app.route('/api/player_awards', methods=['GET'])
 def get_player_awards():
     """Return list of all player names (for compatibility with frontend)"""
-    return jsonify(list(players_db.keys()))
+    return payload_response(player_names(), request, PAYLOAD_MAX_AGE)
+
+@app.route('/api/suggest', methods=['GET'])
+def suggest_players():
+    """Return player names matching a typed prefix, best matches first"""
+    query = request.args.get('q', '')
+    limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+    response = jsonify(list(current_database().suggest_index.suggest(query, limit)))
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    response.add_etag()
+    return response.make_conditional(request)
 
 @app.route('/api/players_data', methods=['GET'])
 def get_players_data():
     """Return summary data for all players (used for filtering)"""
     try:
-        summary = create_players_summary()
-        return jsonify(summary)
+        db = current_database()
+        payload = encoded_payload('players_data', lambda: create_players_summary(db), db)
+        return payload_response(payload, request, PAYLOAD_MAX_AGE)
     except Exception as e:
         print(f"Error creating players summary: {e}")
         return jsonify({"error": "Failed to create players summary"}), 500
@@ -254,56 +581,398 @@ def get_single_player(player_name):
         "data": enhanced_data
     })
 
+@app.route('/api/player/<player_name>/difficulty', methods=['GET'])
+def get_player_difficulty(player_name):
+    """Return how many players score highly against this player as a target"""
+    scoring = requested_scoring()
+    if scoring is None:
+        return unknown_profile()
+    player_data, matched_name = get_player(player_name)
+    if not player_data:
+        return jsonify({"error": "Player not found"}), 404
+
+    histogram = score_distribution(matched_name, scoring)
+    return jsonify({
+        "name": matched_name,
+        "players_above_50": players_above(histogram),
+        "histogram": histogram
+    })
+
 @app.route('/api/guess', methods=['POST'])
 def guess():
     data = request.json
-    guess_input = data['guess']
-    target_input = data['target']
+    scoring = requested_scoring(data)
+    if scoring is None:
+        return unknown_profile()
 
+    target_key, result = guess_result(data['guess'], data['target'], scoring)
+    if result is None:
+        return jsonify({"error": "Invalid player name."}), 400
+
+    if result["matched_name"] != target_key:
+        game_stats.record_guess(target_key)
+    elif data.get('reveal'):
+        game_stats.record_reveal(target_key)
+    else:
+        game_stats.record_guess(target_key, solved=True)
+    return jsonify(result)
+
+def guess_result(guess_input, target_input, scoring=None):
+    """(target key, /api/guess response body), or (None, None) if either name doesn't resolve.
+
+    Doesn't touch game stats, so play.py can run the scoring path in-process.
+    """
     guess_player, guess_key = get_player(guess_input)
     target_player, target_key = get_player(target_input)
 
     if not guess_player or not target_player:
+        return None, None
+
+    if guess_key == target_key:
+        return target_key, {
+            "score": 100,
+            "message": "🔥 You got it!",
+            "matched_name": guess_key,
+            "top_5": top_similar(target_key, 5, scoring)
+        }
+
+    score, breakdown = pair_score(guess_key, target_key, scoring)
+    return target_key, {
+        "score": score,
+        "matched_name": guess_key,
+        "breakdown": breakdown
+    }
+
+@app.route('/api/guess/batch', methods=['POST'])
+def guess_batch():
+    """Score many guesses in one request.
+
+    Takes either {"target": name, "guesses": [name, ...]} or
+    {"pairs": [[guess, target], ...]} and returns one result per item, in
+    order. Each distinct name is resolved once. A correct guess scores 100
+    but doesn't trigger a top-5 scan, and batch guesses aren't counted in
+    /api/stats. Every item is scored with the same profile.
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object."}), 400
+    scoring = requested_scoring(data)
+    if scoring is None:
+        return unknown_profile()
+    if 'pairs' in data:
+        pairs = data['pairs']
+    elif 'target' in data and 'guesses' in data:
+        pairs = data['guesses']
+        if isinstance(pairs, list):
+            pairs = [(g, data['target']) for g in pairs]
+    else:
+        return jsonify({"error": "Expected 'target' and 'guesses', or 'pairs'."}), 400
+
+    if not isinstance(pairs, list):
+        return jsonify({"error": "Expected a list of guesses."}), 400
+    if len(pairs) > BATCH_MAX_ITEMS:
+        return jsonify({"error": f"Batch is limited to {BATCH_MAX_ITEMS} items."}), 400
+
+    resolved = {}
+    def resolve(name):
+        if not isinstance(name, str):
+            return None
+        if name not in resolved:
+            resolved[name] = get_player(name)[1]
+        return resolved[name]
+
+    results = []
+    for pair in pairs:
+        if isinstance(pair, dict):
+            pair = (pair.get('guess'), pair.get('target'))
+        if not isinstance(pair, (list, tuple)) or len(pair) != 2:
+            results.append({"error": "Expected a [guess, target] pair."})
+            continue
+
+        guess_key, target_key = resolve(pair[0]), resolve(pair[1])
+        if guess_key is None or target_key is None:
+            results.append({"error": "Invalid player name."})
+        elif guess_key == target_key:
+            results.append({"score": 100, "matched_name": guess_key, "target": target_key})
+        else:
+            score, breakdown = pair_score(guess_key, target_key, scoring)
+            results.append({
+                "score": score,
+                "matched_name": guess_key,
+                "target": target_key,
+                "breakdown": breakdown
+            })
+
+    return jsonify({"results": results})
+
+def puzzle_info(puzzle_id):
+    db = current_database()
+    return {
+        "puzzle_id": puzzle_id,
+        "date": db.puzzle_calendar.date_of(puzzle_id).isoformat(),
+        "total_players": len(db.players)
+    }
+
+@app.route('/api/puzzle', methods=['GET'])
+def get_todays_puzzle():
+    """Return today's daily puzzle ID"""
+    return jsonify(puzzle_info(current_database().puzzle_calendar.today()))
+
+@app.route('/api/puzzle/<int:puzzle_id>/guess', methods=['POST'])
+def puzzle_guess(puzzle_id):
+    """Score a guess against a puzzle's target and report its rank among all players"""
+    target_key = current_database().puzzle_calendar.target(puzzle_id)
+    if target_key is None:
+        return jsonify({"error": "Puzzle not found"}), 404
+
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object."}), 400
+    guess_player, guess_key = get_player(data.get('guess') or '')
+    if not guess_player:
         return jsonify({"error": "Invalid player name."}), 400
 
-    guess_counter[target_key] = guess_counter.get(target_key, 0) + 1
+    game_stats.record_guess(target_key, solved=guess_key == target_key)
+    ranking = target_ranking(target_key)
 
     if guess_key == target_key:
-        similarities = []
-        for other_name, other_data in players_db.items():
-            if other_name == target_key:
-                continue
-            sim_score, _ = compute_similarity(other_data, target_player, other_name, target_key)
-            similarities.append((other_name, sim_score))
-        top_5 = sorted(similarities, key=lambda x: x[1], reverse=True)[:5]
-
         return jsonify({
             "score": 100,
+            "rank": 1,
             "message": "🔥 You got it!",
             "matched_name": guess_key,
-            "top_5": top_5
+            "top_5": ranking.top(5),
+            **puzzle_info(puzzle_id)
         })
 
-    score, breakdown = compute_similarity(guess_player, target_player, guess_key, target_key)
+    score, breakdown = pair_score(guess_key, target_key)
+    return jsonify({
+        "score": score,
+        "rank": ranking.rank(guess_key),
+        "matched_name": guess_key,
+        "breakdown": breakdown,
+        **puzzle_info(puzzle_id)
+    })
 
+@app.route('/api/puzzle/<int:puzzle_id>/reveal', methods=['POST'])
+def puzzle_reveal(puzzle_id):
+    """Give up on a puzzle: return its answer and closest players"""
+    target_key = current_database().puzzle_calendar.target(puzzle_id)
+    if target_key is None:
+        return jsonify({"error": "Puzzle not found"}), 404
+    game_stats.record_reveal(target_key)
+    return jsonify({
+        "answer": target_key,
+        "top_5": target_ranking(target_key).top(5),
+        **puzzle_info(puzzle_id)
+    })
+
+def prefetch_top_5(session, scoring):
+    """Start the session's top-5 in the background, unless too many are already waiting"""
+    if not prefetch_slots.acquire(blocking=False):
+        return
+    session.version = current_database().version
+    try:
+        session.top_5 = prefetch_pool.submit(top_similar, session.target_key, 5, scoring)
+    except RuntimeError:
+        prefetch_slots.release()
+        return
+    session.top_5.add_done_callback(lambda _: prefetch_slots.release())
+
+def session_top_5(session, scoring):
+    """The prefetched top 5 when it is for this database, else computed now"""
+    future = session.top_5
+    if future is not None and session.version == current_database().version:
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Warning: background top-5 for {session.target_key!r} failed: {e}")
+    return top_similar(session.target_key, 5, scoring)
+
+def open_game(game_id):
+    """(session, scoring profile, None), or (None, None, error response)"""
+    session = game_sessions.get(game_id)
+    if session is None:
+        return None, None, (jsonify({"error": "Game not found or expired."}), 404)
+    if session.target_key not in current_database().players:
+        return None, None, (jsonify({"error": "This game's player is no longer in the database."}), 410)
+    return session, scoring_profiles.get(session.profile, default_scoring), None
+
+def invalid_filters():
+    return jsonify({"error": "start_year and career_length filters must be integers, "
+                             "position and team strings or lists of strings."}), 400
+
+@app.route('/api/random_target', methods=['GET'])
+def random_target():
+    """A random player matching start_year_min/max, career_length_min/max, position and team"""
+    try:
+        target_key, matches = choose_target(request.args)
+    except ValueError:
+        return invalid_filters()
+    if target_key is None:
+        return jsonify({"error": "No players match these filters.", "matches": 0}), 404
+    return jsonify({"target": target_key, "matches": matches, "total_players": len(current_database().players)})
+
+@app.route('/api/game', methods=['POST'])
+def create_game():
+    """Start a game against a server-chosen target, optionally filtered like /api/random_target;
+    guesses reference the returned game_id"""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object."}), 400
+    scoring = requested_scoring(data)
+    if scoring is None:
+        return unknown_profile()
+    try:
+        target_key, _ = choose_target(data)
+    except ValueError:
+        return invalid_filters()
+    if target_key is None:
+        return jsonify({"error": "No players match these filters."}), 404
+    db = current_database()
+    game_id, session = game_sessions.create(target_key, scoring.name)
+    prefetch_top_5(session, scoring)
+    return jsonify({
+        "game_id": game_id,
+        "profile": scoring.name,
+        "expires_in": SESSION_TTL,
+        "total_players": len(db.players)
+    }), 201
+
+@app.route('/api/game/<game_id>/guess', methods=['POST'])
+def game_guess(game_id):
+    """Score a guess against the game's target"""
+    session, scoring, error = open_game(game_id)
+    if error:
+        return error
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object."}), 400
+    guess_player, guess_key = get_player(data.get('guess') or '')
+    if not guess_player:
+        return jsonify({"error": "Invalid player name."}), 400
+    solved = guess_key == session.target_key
+    if session.finished or not game_sessions.record_guess(session, solved):
+        return jsonify({"error": "This game is over.", "answer": session.target_key}), 409
+
+    if solved:
+        game_stats.record_guess(session.target_key, solved=True)
+        return jsonify({
+            "score": 100,
+            "message": "🔥 You got it!",
+            "matched_name": guess_key,
+            "guesses": session.guesses,
+            "top_5": session_top_5(session, scoring)
+        })
+
+    game_stats.record_guess(session.target_key)
+    score, breakdown = pair_score(guess_key, session.target_key, scoring)
     return jsonify({
         "score": score,
         "matched_name": guess_key,
+        "guesses": session.guesses,
         "breakdown": breakdown
     })
 
+@app.route('/api/game/<game_id>/reveal', methods=['POST'])
+def game_reveal(game_id):
+    """Give up: return the game's answer and closest players"""
+    session, scoring, error = open_game(game_id)
+    if error:
+        return error
+    if game_sessions.finish(session):
+        game_stats.record_reveal(session.target_key)
+    return jsonify({
+        "answer": session.target_key,
+        "guesses": session.guesses,
+        "top_5": session_top_5(session, scoring)
+    })
+
+@app.route('/api/scoring_profiles', methods=['GET'])
+def get_scoring_profiles():
+    """Return every scoring profile's components; pass ?profile=<name> to any scoring endpoint"""
+    return jsonify({
+        "default": default_scoring.name,
+        "profiles": {name: scoring.spec for name, scoring in scoring_profiles.items()}
+    })
+
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """Return game statistics"""
     return jsonify({
-        "total_players": len(players_db),
-        "total_guesses": sum(guess_counter.values()),
-        "games_played": len(guess_counter)
+        "total_players": len(current_database().players),
+        **game_stats.summary(),
+        "caches": {
+            "pair_scores": score_cache.stats(),
+            "top_similar": top_cache.stats(),
+            "rankings": ranking_cache.stats()
+        },
+        "sessions": game_sessions.stats(),
+        "admission": admission.stats() if admission is not None else None,
+        "rate_limit": rate_limiter.stats() if rate_limiter is not None else None
     })
 
+@app.route('/api/stats/targets', methods=['GET'])
+def get_target_stats():
+    """Return per-target guess counts and solve rates, most-guessed first"""
+    limit = max(1, min(request.args.get('limit', 20, type=int), 500))
+    target = request.args.get('target')
+    if target:
+        _, target = get_player(target)
+        if target is None:
+            return jsonify({"error": "Player not found"}), 404
+    return jsonify(game_stats.targets(limit, target))
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Return request, lookup, top-5 and scoring metrics in Prometheus text format"""
+    if metrics is None:
+        return jsonify({"error": "Metrics are disabled. Set METRICS_ENABLED=1."}), 404
+    caches = {"pair_scores": score_cache, "top_similar": top_cache, "rankings": ranking_cache}
+    cache_stats = {name: cache.stats() for name, cache in caches.items()}
+    body = metrics.render()
+    body += render_samples('nba_mantle_players_loaded', 'gauge', 'Players in the loaded database',
+                           [((), len(current_database().players))])
+    body += render_samples('nba_mantle_game_sessions', 'gauge', 'Game sessions held by this worker',
+                           [((), len(game_sessions))])
+    if admission is not None:
+        classes = admission.stats()['classes']
+        body += render_samples('nba_mantle_admission_running', 'gauge', 'Admitted requests running by class',
+                               [((('class', name),), stats['running']) for name, stats in classes.items()])
+        body += render_samples('nba_mantle_admission_waiting', 'gauge', 'Requests waiting for a slot by class',
+                               [((('class', name),), stats['waiting']) for name, stats in classes.items()])
+        body += render_samples('nba_mantle_admission_turned_away_total', 'counter',
+                               'Requests answered 503 by class and reason (rejected, shed, timed_out)',
+                               [((('class', name), ('reason', reason)), stats[reason])
+                                for name, stats in classes.items() for reason in ('rejected', 'shed', 'timed_out')])
+    if rate_limiter is not None:
+        body += render_samples('nba_mantle_rate_limited_total', 'counter', 'Requests answered 429 by the rate limit',
+                               [((), rate_limiter.limited)])
+    for field, kind in (('hits', 'counter'), ('misses', 'counter'), ('evictions', 'counter'), ('size', 'gauge')):
+        suffix = '_total' if kind == 'counter' else ''
+        body += render_samples(f'nba_mantle_cache_{field}{suffix}', kind, f'Cache {field}',
+                               [((('cache', name),), stats[field]) for name, stats in cache_stats.items()])
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/metrics/profile', methods=['GET', 'POST'])
+def metrics_profile():
+    """POST starts profiling every request for ?seconds=N; GET returns the aggregated cProfile report"""
+    if profiler is None:
+        return jsonify({"error": "Metrics are disabled. Set METRICS_ENABLED=1."}), 404
+    if request.method == 'POST':
+        seconds = max(1.0, min(request.args.get('seconds', 10, type=float), 300.0))
+        return jsonify({"profiling_until": profiler.start(seconds), "pid": os.getpid()}), 202
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in ('cumulative', 'tottime', 'ncalls'):
+        return jsonify({"error": "sort must be cumulative, tottime or ncalls"}), 400
+    report = profiler.report(limit=max(1, min(request.args.get('limit', 40, type=int), 500)), sort=sort)
+    if report is None:
+        return jsonify({"error": "No profile collected. POST to start one."}), 404
+    return Response(report, mimetype='text/plain')
+
 if __name__ == '__main__':
     print("Starting NBA Similarity Game Backend...")
-    print(f"Loaded {len(players_db)} players from database")
+    print(f"Loaded {len(database.players)} players from database (version {database.version})")
     port = int(os.environ.get("PORT", 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
     
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""Offline all-pairs neighbor index.
+
+Build it next to the database with:
+
+    python neighbor_index.py players_awards.json --k 25 --workers 8
+
+The backend loads the index at startup and answers the win/reveal top 5 with
+a lookup. The file records a hash of the database it was built from and the
+fingerprint of the scoring profile it used, so a stale index is ignored and
+the server falls back to live scoring. Requests for any other profile are
+scored live.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from player_features import compile_players
+from scoring_profiles import load_profiles
+from similarity_engine import SimilarityEngine
+
+INDEX_FORMAT = "nba-mantle-neighbors"
+INDEX_VERSION = 3
+SCORE_BINS = 100  # scores are capped at 99
+DIFFICULTY_THRESHOLD = 50
+
+
+def database_hash(raw):
+    """Hash of the raw database bytes, used to key derived artifacts"""
+    return hashlib.sha256(raw).hexdigest()
+
+
+def default_index_path(db_path):
+    root, _ = os.path.splitext(db_path)
+    return root + ".neighbors.json"
+
+
+def score_histogram(scores, exclude=None):
+    """Count of players at each score 0-99, leaving out the target itself"""
+    histogram = np.bincount(scores, minlength=SCORE_BINS)
+    if exclude is not None:
+        histogram[scores[exclude]] -= 1
+    return histogram
+
+
+def players_above(histogram, threshold=DIFFICULTY_THRESHOLD):
+    return int(sum(histogram[threshold + 1:]))
+
+
+class NeighborIndex:
+    """Precomputed top-K neighbors and score histogram for every player"""
+
+    def __init__(self, data):
+        self.db_hash = data["db_hash"]
+        self.scoring = data["scoring"]
+        self.profile_fingerprint = data["profile_fingerprint"]
+        self.k = data["k"]
+        self.names = data["names"]
+        self.entries = dict(zip(self.names, data["players"]))
+
+    def top(self, name, n=5):
+        """Top `n` (name, score) pairs, or None if the index can't answer"""
+        entry = self.entries.get(name)
+        if entry is None or n > self.k:
+            return None
+        return [(self.names[i], score) for i, score in entry["top"][:n]]
+
+    def histogram(self, name):
+        entry = self.entries.get(name)
+        return entry["histogram"] if entry is not None else None
+
+
+def load_neighbor_index(path, db_hash):
+    """Load the index if it exists and was built from this exact database"""
+    if not db_hash or not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read neighbor index {path}: {e}")
+        return None
+    if data.get("format") != INDEX_FORMAT or data.get("version") != INDEX_VERSION:
+        print(f"Warning: {path} has an unsupported format. Using live scoring.")
+        return None
+    if data.get("db_hash") != db_hash:
+        print(f"Warning: {path} was built from a different database. Using live scoring.")
+        return None
+    return NeighborIndex(data)
+
+
+# Process pool workers each build their own engine once, then score chunks
+_worker_engine = None
+_worker_profile = None
+
+
+def _init_worker(db_path, profile_name, profiles_path):
+    global _worker_engine, _worker_profile
+    with open(db_path, encoding="utf-8") as f:
+        players_db = json.load(f)
+    compiled, _ = compile_players(players_db)
+    _worker_engine = SimilarityEngine(compiled)
+    _worker_profile = load_profiles(profiles_path)[profile_name]
+
+
+def _score_chunk(args):
+    start, end, k = args
+    engine = _worker_engine
+    results = []
+    for i in range(start, end):
+        scores = engine.score_all(engine.names[i], _worker_profile)
+        top = [[j, int(scores[j])] for j in engine.best(scores, k, i)]
+        results.append({"top": top, "histogram": score_histogram(scores, i).tolist()})
+    return start, results
+
+
+def build_index(db_path, out_path, k=25, workers=None, chunk_size=64,
+                profile_name="classic", profiles_path=None):
+    profile = load_profiles(profiles_path)[profile_name]
+    with open(db_path, "rb") as f:
+        raw = f.read()
+    players_db = json.loads(raw)
+    names = list(players_db)
+    del players_db
+
+    chunks = [(start, min(start + chunk_size, len(names)), k)
+              for start in range(0, len(names), chunk_size)]
+    entries = [None] * len(names)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(db_path, profile_name, profiles_path)) as pool:
+        for start, results in pool.map(_score_chunk, chunks):
+            entries[start:start + len(results)] = results
+
+    index = {
+        "format": INDEX_FORMAT,
+        "version": INDEX_VERSION,
+        "db_hash": database_hash(raw),
+        "scoring": profile.name,
+        "profile_fingerprint": profile.fingerprint,
+        "k": k,
+        "names": names,
+        "players": entries,
+    }
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, out_path)
+    return len(names)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the all-pairs neighbor index")
+    parser.add_argument("db", nargs="?", default="players_awards.json")
+    parser.add_argument("--out", help="output path (default: <db>.neighbors.json)")
+    parser.add_argument("--k", type=int, default=25, help="neighbors kept per player")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size")
+    parser.add_argument("--profile", default="classic", help="scoring profile to rank with")
+    parser.add_argument("--profiles", default="scoring_profiles.json", help="extra scoring profiles file")
+    args = parser.parse_args()
+
+    if args.profile not in load_profiles(args.profiles):
+        parser.error(f"unknown scoring profile {args.profile!r}")
+    out_path = args.out or default_index_path(args.db)
+    started = time.perf_counter()
+    count = build_index(args.db, out_path, k=args.k, workers=args.workers,
+                        profile_name=args.profile, profiles_path=args.profiles)
+    print(f"✅ Indexed {count} players in {time.perf_counter() - started:.1f}s -> {out_path}")
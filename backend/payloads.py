@@ -0,0 +1,63 @@
+import gzip
+import hashlib
+
+from flask import Response
+
+
+class EncodedPayload:
+    """A JSON response body encoded once, with a gzip copy and a strong ETag for each"""
+
+    def __init__(self, body, compresslevel=6):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=compresslevel, mtime=0)
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.gzip_etag = self.etag + "-gzip"
+
+    @classmethod
+    def from_json(cls, app, obj):
+        # Encoded exactly as jsonify would, so clients see identical bytes
+        return cls(encode_json(app, obj))
+
+
+def encode_json(app, obj, chunk_size=512):
+    """Return jsonify's body for obj, encoding a large dict or list a slice at a time.
+
+    One json.dumps call holds the GIL until it finishes, which for a
+    whole-database payload stalls every other request thread for hundreds
+    of milliseconds. Compact output is the same bytes either way.
+    """
+    provider = app.json
+    indented = (provider.compact is None and app.debug) or provider.compact is False
+    if indented or not isinstance(obj, (dict, list)) or len(obj) <= chunk_size:
+        return provider.response(obj).get_data()
+    if isinstance(obj, dict):
+        if not all(isinstance(key, str) for key in obj):
+            return provider.response(obj).get_data()
+        keys = sorted(obj) if provider.sort_keys else list(obj)
+        slices = ({key: obj[key] for key in keys[i:i + chunk_size]} for i in range(0, len(keys), chunk_size))
+        opening, closing = "{", "}"
+    else:
+        slices = (obj[i:i + chunk_size] for i in range(0, len(obj), chunk_size))
+        opening, closing = "[", "]"
+    parts = [provider.dumps(part, separators=(",", ":"))[1:-1] for part in slices]
+    return f"{opening}{','.join(parts)}{closing}\n".encode("utf-8")
+
+
+def payload_response(payload, request, max_age=300):
+    """Serve a pre-encoded payload, honoring If-None-Match and Accept-Encoding"""
+    gzipped = bool(request.accept_encodings["gzip"])
+    etag = payload.gzip_etag if gzipped else payload.etag
+    # A copy of either encoding is the same document, so either ETag validates it
+    cached = next((tag for tag in (payload.etag, payload.gzip_etag) if tag in request.if_none_match), None)
+    if cached is not None:
+        response = Response(status=304)
+        etag = cached
+    elif gzipped:
+        response = Response(payload.gzipped, mimetype="application/json")
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = Response(payload.body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={max_age}"
+    response.vary.add("Accept-Encoding")
+    return response
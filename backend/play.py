@@ -1,28 +1,105 @@
-import requests
+"""Play the NBA similarity game in the terminal.
+
+    python play.py                       # against a running server (--url)
+    python play.py --engine              # score in this process, no server needed
+    python play.py --engine --bench 200  # play 200 automated games, print latency
+
+HTTP mode talks to the production /api endpoints over one keep-alive
+connection. Engine mode imports the backend and calls the same scoring
+path /api/guess uses, so --bench in each mode shows the HTTP overhead.
+"""
+import argparse
 import json
-import random
 import os
+import random
+import sys
+import tempfile
+import time
+
+API_URL = os.environ.get("NBA_MANTLE_URL", "http://127.0.0.1:5000")
+# Modern players only (2003 on, 5+ seasons), as /api/random_target filters
+MODERN_FILTERS = {"start_year_min": 2003, "career_length_min": 5}
+
+def load_players(path="backend/players_cleaned.json"):
+    """Load cleaned players"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def select_modern_players(players_data):
+    """Filter: modern players only (post-2010, 6+ seasons)"""
+    return [
+        name for name, info in players_data.items()
+        if info.get("start_year", 0) >= 2003 and info.get("career_length", 0) >= 5
+    ]
+
+class EngineClient:
+    """Plays against the backend's scoring code in this process"""
+
+    def __init__(self, db_path=None):
+        if db_path or "PLAYERS_DB_PATH" not in os.environ:
+            default = os.path.join(os.path.dirname(os.path.abspath(__file__)), "players_awards.json")
+            os.environ["PLAYERS_DB_PATH"] = os.path.abspath(db_path or default)
+        # Keep CLI games out of the server's stats
+        os.environ.setdefault("STATS_DB_PATH", os.path.join(
+            tempfile.mkdtemp(prefix="nba-mantle-play-"), "game_stats.sqlite3"))
+        import nba_mantle_backend as backend
+        self.backend = backend
+        self.where = os.environ["PLAYERS_DB_PATH"]
+
+    def player_names(self):
+        return list(self.backend.database.players)
+
+    def random_target(self):
+        return self.backend.choose_target(MODERN_FILTERS)[0] or self.backend.choose_target({})[0]
+
+    def guess(self, guess, target, reveal=False):
+        """(/api/guess response body, None) or (None, error message)"""
+        _, result = self.backend.guess_result(guess, target)
+        if result is None:
+            return None, "Invalid player name."
+        return result, None
+
+class HttpClient:
+    """Plays against a running server, reusing one keep-alive connection"""
+
+    def __init__(self, url):
+        import requests
+        self.url = url.rstrip("/")
+        self.session = requests.Session()
+        self.where = self.url
+
+    def player_names(self):
+        response = self.session.get(f"{self.url}/api/players")
+        response.raise_for_status()
+        return response.json()
+
+    def random_target(self):
+        for filters in (MODERN_FILTERS, {}):
+            response = self.session.get(f"{self.url}/api/random_target", params=filters)
+            if response.ok:
+                return response.json()["target"]
+        response.raise_for_status()
+
+    def guess(self, guess, target, reveal=False):
+        """(/api/guess response body, None) or (None, error message)"""
+        payload = {"guess": guess, "target": target}
+        if reveal:
+            payload["reveal"] = True
+        response = self.session.post(f"{self.url}/api/guess", json=payload)
+        if response.ok:
+            return response.json(), None
+        try:
+            error = response.json().get("error")
+        except ValueError:
+            error = None
+        return None, error or f"HTTP {response.status_code}"
 
-def get_top_5(target_name):
-    payload = {"guess": target_name, "target": target_name}
-    response = requests.post("http://127.0.0.1:5000/guess", json=payload)
-    if response.ok:
-        result = response.json()
-        return result.get("top_5", [])
-    return []
-
-# Load cleaned players
-with open("backend/players_cleaned.json", encoding="utf-8") as f:
-    players_data = json.load(f)
-
-# Filter: modern players only (post-2010, 6+ seasons)
-modern_players = [
-    name for name, info in players_data.items()
-    if info.get("start_year", 0) >= 2003 and info.get("career_length", 0) >= 5
-]
-
-def play_game():
-    target = random.choice(modern_players)
+def get_top_5(client, target_name):
+    result, _ = client.guess(target_name, target_name, reveal=True)
+    return result.get("top_5", []) if result else []
+
+def play_game(client):
+    target = client.random_target()
     #target = "Serge Ibaka"
     guess_count = 0
     history = []
@@ -37,7 +114,7 @@ def play_game():
             break
         if guess.lower() == "reveal":
             print(f"\n🎯 The answer was: {target}\n")
-            top_5 = get_top_5(target)
+            top_5 = get_top_5(client, target)
             if top_5:
                 print("🏀 Top 5 Closest Players:")
                 for name, score in top_5:
@@ -45,12 +122,10 @@ def play_game():
             break
 
         guess_count += 1
-        payload = {"guess": guess, "target": target}
 
         try:
-            response = requests.post("http://127.0.0.1:5000/guess", json=payload)
-            if response.ok:
-                result = response.json()
+            result, error = client.guess(guess, target)
+            if result is not None:
                 score = result["score"]
                 top_5 = result.get("top_5", [])
                 message = result.get("message", "")
@@ -86,16 +161,74 @@ def play_game():
                     print(f"\n🔥 You got it! The answer was {target} in {guess_count} guesses.\n")
                     break
             else:
-                error_msg = response.json().get("error", "Unknown error.")
-                print(f"❌ {error_msg}\n")
+                print(f"❌ {error}\n")
         except Exception as e:
-            print("⚠️ Connection error. Make sure the Flask server is running on http://127.0.0.1:5000")
+            print(f"⚠️ Connection error. Make sure the server is running on {client.where}")
+            break
+
+def latency_row(label, samples_ns):
+    samples = sorted(samples_ns)
+    if not samples:
+        return f"{label:<22} {0:>7}"
+    pick = lambda q: samples[min(len(samples) - 1, int(round(q * (len(samples) - 1))))] / 1e6
+    mean = sum(samples) / len(samples) / 1e6
+    return (f"{label:<22} {len(samples):>7} {mean:>9.3f} {pick(0.5):>9.3f} {pick(0.95):>9.3f} "
+            f"{pick(0.99):>9.3f} {samples[-1] / 1e6:>9.3f}")
+
+def run_bench(client, games, guesses_per_game, seed):
+    """Play automated games: `guesses_per_game` random guesses, then the answer"""
+    rng = random.Random(seed)
+    names = client.player_names()
+    wrong_ns, win_ns = [], []
+    errors = 0
+    clock = time.perf_counter_ns
+    started = clock()
+    for _ in range(games):
+        target = client.random_target()
+        for guess in rng.sample(names, min(guesses_per_game, len(names))) + [target]:
+            t0 = clock()
+            result, error = client.guess(guess, target)
+            elapsed = clock() - t0
+            if result is None:
+                errors += 1
+            elif result["score"] == 100:
+                win_ns.append(elapsed)
+            else:
+                wrong_ns.append(elapsed)
+    seconds = (clock() - started) / 1e9
+    total = len(wrong_ns) + len(win_ns) + errors
+
+    print(f"{games} games, {total} guesses against {client.where} in {seconds:.2f}s "
+          f"({total / seconds:.0f} guesses/sec, {errors} errors)")
+    print(f"{'guess latency (ms)':<22} {'count':>7} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    print("-" * 80)
+    print(latency_row("wrong guess", wrong_ns))
+    print(latency_row("winning guess (top 5)", win_ns))
+    print(latency_row("all", wrong_ns + win_ns))
+
+def main():
+    parser = argparse.ArgumentParser(description="Play the NBA similarity game in the terminal")
+    parser.add_argument("--engine", action="store_true", help="score in this process instead of calling a server")
+    parser.add_argument("--db", help="player database for --engine (default: PLAYERS_DB_PATH or players_awards.json)")
+    parser.add_argument("--url", default=API_URL, help=f"server to play against (default: {API_URL})")
+    parser.add_argument("--bench", type=int, metavar="N", help="play N automated games and print per-guess latency")
+    parser.add_argument("--guesses", type=int, default=10, help="wrong guesses per benchmark game (default: 10)")
+    parser.add_argument("--seed", type=int, default=0, help="benchmark guess order seed")
+    args = parser.parse_args()
+
+    client = EngineClient(args.db) if args.engine else HttpClient(args.url)
+    if args.bench:
+        run_bench(client, args.bench, args.guesses, args.seed)
+        return 0
+
+    # 🔁 Main loop to allow replay
+    while True:
+        play_game(client)
+        again = input("\n🔁 Play again? (y/n): ").strip().lower()
+        if again != "y":
+            print("\n👋 Thanks for playing!\n")
             break
+    return 0
 
-# 🔁 Main loop to allow replay
-while True:
-    play_game()
-    again = input("\n🔁 Play again? (y/n): ").strip().lower()
-    if again != "y":
-        print("\n👋 Thanks for playing!\n")
-        break
+if __name__ == "__main__":
+    sys.exit(main())
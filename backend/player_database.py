@@ -0,0 +1,166 @@
+"""Versioned, immutable loads of the player database, swapped whole on reload.
+
+A PlayerDatabase bundles the records with everything derived from them:
+compiled features and teammate graph, the similarity engine, name indexes,
+the neighbor index and the puzzle calendar. Nothing in it changes after it
+is built, so a request holding one keeps a consistent view while a reload
+builds the next one off the request path; swapping is a single reference
+assignment. FileWatcher triggers reloads when the files change.
+"""
+import ctypes
+import gc
+import hashlib
+import os
+import threading
+import time
+
+from daily_puzzle import PuzzleCalendar
+from name_index import NameIndex, SuggestIndex
+from neighbor_index import load_neighbor_index
+from player_features import compile_players
+from player_snapshot import PlayerSnapshot
+from player_stream import HashingReader, iter_players
+from score_cache import LRUCache
+from similarity_engine import SimilarityEngine
+
+
+def read_players(db_path, snapshot_path):
+    """Return the player records and a hash of the JSON they were built from.
+
+    Uses the memory-mapped binary snapshot when there is an up-to-date one,
+    otherwise parses the JSON.
+    """
+    if snapshot_path and os.path.exists(snapshot_path):
+        try:
+            snapshot = PlayerSnapshot(snapshot_path)
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not load {snapshot_path}: {e}")
+        else:
+            if snapshot.matches(db_path):
+                return snapshot, snapshot.db_hash
+            print(f"Warning: {snapshot_path} is older than {db_path}. Loading JSON.")
+    # Parsed a record at a time so a reload doesn't stall requests on the GIL.
+    # Teammate years come from the season rosters (teammate_graph.py); older
+    # databases still carry name-keyed maps, which are most of their memory
+    players = {}
+    digest = hashlib.sha256()  # as database_hash(), without holding the file
+    try:
+        with open(db_path, 'rb') as f:
+            reader = HashingReader(f, digest)
+            for name, player, _ in iter_players(reader, db_path):
+                player.pop('teammate_years', None)
+                players[name] = player
+            reader.drain()
+    except FileNotFoundError:
+        print(f"Warning: {db_path} not found. Using empty database.")
+        return {}, None
+    return players, digest.hexdigest()
+
+
+# Loaded once: each CDLL builds a class with a reference cycle
+_libc = None
+
+
+def release_free_memory():
+    """Hand freed heap pages back to the OS, where the C library can (glibc)"""
+    global _libc
+    try:
+        if _libc is None:
+            _libc = ctypes.CDLL(None)
+        _libc.malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class PlayerDatabase:
+    """One load of the player database and everything derived from it"""
+
+    def __init__(self, players, db_hash, index_path, puzzle_epoch, puzzle_salt, puzzle_overrides):
+        self.players = players
+        self.db_hash = db_hash
+        # Content-addressed, so every worker reports the same version for the same file
+        self.version = db_hash[:16] if db_hash else "empty"
+        self.compiled, self.team_codes = compile_players(players)
+        self.engine = SimilarityEngine(self.compiled)
+        self.neighbor_index = load_neighbor_index(index_path, db_hash)
+        self.name_index = NameIndex(players)
+        self.suggest_index = SuggestIndex(players)
+        self.puzzle_calendar = PuzzleCalendar(players, puzzle_epoch, puzzle_salt, puzzle_overrides)
+        # Encoded bodies of the whole-database endpoints, built at most once per load
+        self.payloads = LRUCache(8)
+        self.loaded_at = time.time()
+
+    @classmethod
+    def load(cls, db_path, snapshot_path, index_path, puzzle_epoch, puzzle_salt, puzzle_overrides):
+        # A full garbage collection walks every object of both the serving
+        # and the loading database while holding the GIL. Collection is
+        # paused for the build and the result frozen out of the collector's
+        # reach; a dropped database has no reference cycles, so reference
+        # counting still frees it. Frozen objects are never collected, so
+        # first collect everything else, which is cheap while the serving
+        # database is frozen: only cycles made during the build get pinned.
+        gc.collect()
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            players, db_hash = read_players(db_path, snapshot_path)
+            db = cls(players, db_hash, index_path, puzzle_epoch, puzzle_salt, puzzle_overrides)
+        finally:
+            if enabled:
+                gc.enable()
+        gc.freeze()
+        return db
+
+
+class FileWatcher:
+    """Calls `callback` from a background thread after any of `paths` changes.
+
+    Files are polled by size and mtime every `interval` seconds, and a
+    change must hold still for one more poll before it counts, so a file
+    still being written isn't loaded half-way. The baseline is taken at
+    construction: create the watcher before loading, and a change that
+    lands during the load still triggers a reload.
+    """
+
+    def __init__(self, paths, interval, callback):
+        self.paths = tuple(p for p in paths if p)
+        self.interval = interval
+        self.callback = callback
+        self._seen = self._signature()
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def _signature(self):
+        signature = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                signature.append(None)
+            else:
+                signature.append((stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    def ensure_started(self):
+        # Started lazily so each forked gunicorn worker gets its own thread
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                threading.Thread(target=self._run, name="database-watcher", daemon=True).start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        pending = None
+        while True:
+            time.sleep(self.interval)
+            signature = self._signature()
+            if signature == self._seen or signature != pending:
+                pending = signature if signature != self._seen else None
+                continue
+            self._seen = signature
+            pending = None
+            try:
+                self.callback()
+            except Exception as e:
+                print(f"Warning: could not reload the player database: {e}")
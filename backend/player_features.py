@@ -0,0 +1,200 @@
+import threading
+
+from teammate_graph import TeammateGraph
+
+# (team, season) pairs are packed into a single int: team code in the high
+# bits, season year in the low bits. Seasons are calendar years, so 12 bits
+# is plenty and keeps the keys small enough to hash quickly.
+SEASON_BITS = 12
+SEASON_MASK = (1 << SEASON_BITS) - 1
+
+EMPTY = frozenset()
+
+
+def season_key(team_code, season):
+    return (team_code << SEASON_BITS) | season
+
+
+class TeamCodes:
+    """Interns team abbreviations as small integer codes"""
+
+    def __init__(self):
+        self.codes = {}
+        self.names = []
+        self._lock = threading.Lock()
+
+    def code(self, team):
+        code = self.codes.get(team)
+        if code is not None:
+            return code
+        with self._lock:
+            code = self.codes.get(team)
+            if code is None:
+                code = len(self.names)
+                self.names.append(team)
+                self.codes[team] = code
+            return code
+
+    def __len__(self):
+        return len(self.names)
+
+
+class CompiledPlayer:
+    """Precomputed, read-only view of a player's scoring features"""
+
+    __slots__ = (
+        "season_keys",
+        "teams",
+        "team_seasons",
+        "position",
+        "position_prefix",
+        "start_year",
+        "draft_year",
+        "career_length",
+        "all_star_seasons",
+        "all_team_selections",
+        "awards_won",
+        "graph",
+        "row",
+    )
+
+    def __init__(self, player, team_codes):
+        # Per-team season index, used for both shared seasons and tenure
+        team_seasons = {}
+        for s in player.get("seasons", []):
+            team_seasons.setdefault(team_codes.code(s["team"]), set()).add(s["season"])
+
+        self._fill(
+            team_seasons,
+            (team_codes.code(t) for t in player.get("teams", [])),
+            player.get("position", ""),
+            player.get("start_year", 0),
+            player.get("draft_year", 0),
+            player.get("career_length", 0),
+            player.get("all_star_seasons", []),
+            ((sel["season"], sel["type"]) for sel in player.get("all_team_selections", [])),
+            player.get("awards_won", []),
+        )
+
+    @classmethod
+    def from_fields(cls, team_seasons, teams, position, start_year, draft_year, career_length,
+                    all_star_seasons, all_team_selections, awards_won):
+        """Build from already-decoded fields (team codes, (season, type) pairs)"""
+        compiled = cls.__new__(cls)
+        compiled._fill(team_seasons, teams, position, start_year, draft_year, career_length,
+                       all_star_seasons, all_team_selections, awards_won)
+        return compiled
+
+    def _fill(self, team_seasons, teams, position, start_year, draft_year, career_length,
+              all_star_seasons, all_team_selections, awards_won):
+        self.team_seasons = {team: frozenset(years) for team, years in team_seasons.items()}
+        self.season_keys = frozenset(
+            season_key(team, year)
+            for team, years in self.team_seasons.items()
+            for year in years
+        )
+        self.teams = frozenset(teams)
+        self.position = position
+        self.position_prefix = position[:2]
+        self.start_year = start_year
+        self.draft_year = draft_year
+        self.career_length = career_length
+        self.all_star_seasons = frozenset(all_star_seasons)
+        self.all_team_selections = frozenset(all_team_selections)
+        self.awards_won = frozenset(awards_won)
+        # Set by compile_players for database players: their row in the shared teammate graph
+        self.graph = None
+        self.row = None
+
+
+def compile_players(players_db, team_codes=None):
+    """Compile every player in the database, sharing one team code table.
+
+    Also derives the teammate graph from the compiled rosters and gives each
+    player its row in it, in database order.
+    """
+    if team_codes is None:
+        team_codes = TeamCodes()
+    # Snapshot-backed databases compile straight from their arrays
+    compile_features = getattr(players_db, "compile_features", None)
+    if compile_features is not None:
+        compiled = compile_features(team_codes)
+    else:
+        compiled = {name: CompiledPlayer(data, team_codes) for name, data in players_db.items()}
+    graph = TeammateGraph.from_season_keys((p.season_keys for p in compiled.values()), SEASON_BITS)
+    for row, player in enumerate(compiled.values()):
+        player.graph = graph
+        player.row = row
+    return compiled, team_codes
+
+
+def longest_shared_streak(player1, player2):
+    """Longest run of consecutive shared seasons"""
+    years = sorted(key & SEASON_MASK for key in player1.season_keys & player2.season_keys)
+    streak = 1
+    max_streak = 1
+    for i in range(1, len(years)):
+        if years[i] == years[i-1] + 1:
+            streak += 1
+            max_streak = max(max_streak, streak)
+        else:
+            streak = 1
+    return max_streak
+
+
+def years_together(player1, player2):
+    """Distinct seasons both players spent on the same roster (symmetric)"""
+    graph = player1.graph
+    if graph is not None and graph is player2.graph:
+        return graph.years(player1.row, player2.row)
+    # A player outside the database: same definition, straight from the rosters
+    return len({key & SEASON_MASK for key in player1.season_keys & player2.season_keys})
+
+
+def shared_tenure(player1, player2):
+    """Seasons together on each shared franchise, capped at 3 per team"""
+    tenure_bonus = 0
+    p1_index = player1.team_seasons
+    p2_index = player2.team_seasons
+    for team in player1.teams & player2.teams:
+        overlap = len(p1_index.get(team, EMPTY) & p2_index.get(team, EMPTY))
+        tenure_bonus += min(overlap, 3)
+    return tenure_bonus
+
+
+# Raw per-pair features, named like SimilarityEngine.components() so scoring
+# profiles read the same inputs in the scalar and vectorized paths. Each is
+# an expression over player1, player2 and the features before it;
+# scoring_profiles.py compiles the ones a profile uses into one function.
+PAIR_FEATURES = (
+    ("shared_seasons", "len(player1.season_keys & player2.season_keys)"),
+    ("max_streak", "longest_shared_streak(player1, player2) if shared_seasons >= 2 else 1"),
+    ("teammate_years", "years_together(player1, player2) if shared_seasons else 0"),
+    ("team_overlap", "len(player1.teams & player2.teams)"),
+    ("tenure", "shared_tenure(player1, player2) if shared_seasons else 0"),
+    ("position_exact", "player1.position == player2.position"),
+    ("position_prefix", "player1.position_prefix == player2.position_prefix"),
+    ("start_diff", "abs(player1.start_year - player2.start_year)"),
+    ("draft_diff", "abs(player1.draft_year - player2.draft_year)"),
+    ("end_diff", "abs((player1.start_year + player1.career_length)"
+                 " - (player2.start_year + player2.career_length))"),
+    ("career_length_diff", "abs(player1.career_length - player2.career_length)"),
+    ("shared_all_star", "not player1.all_star_seasons.isdisjoint(player2.all_star_seasons)"),
+    ("shared_all_team", "not player1.all_team_selections.isdisjoint(player2.all_team_selections)"),
+    ("shared_awards", "not player1.awards_won.isdisjoint(player2.awards_won)"),
+)
+FEATURE_DEPENDENCIES = {"max_streak": ("shared_seasons",), "teammate_years": ("shared_seasons",),
+                        "tenure": ("shared_seasons",)}
+FEATURE_HELPERS = {"longest_shared_streak": longest_shared_streak, "years_together": years_together,
+                   "shared_tenure": shared_tenure}
+
+
+def feature_expressions(names):
+    """(name, expression) for `names` and what they depend on, in registry order"""
+    wanted = set(names)
+    for name in names:
+        wanted.update(FEATURE_DEPENDENCIES.get(name, ()))
+    unknown = wanted - {name for name, _ in PAIR_FEATURES}
+    if unknown:
+        raise ValueError(f"Unknown features: {', '.join(sorted(unknown))}")
+    return tuple((name, expression) for name, expression in PAIR_FEATURES if name in wanted)
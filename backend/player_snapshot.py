@@ -0,0 +1,461 @@
+"""Binary, memory-mapped snapshot of the player database.
+
+Build one next to the JSON with:
+
+    python player_snapshot.py build players_awards.json players_awards.snap
+
+and compare cold start time and per-worker memory of both loaders with:
+
+    python player_snapshot.py report players_awards.json players_awards.snap
+
+Layout: an 8-byte magic, a little-endian u32 header length and a JSON
+header, followed by 16-byte aligned array sections. Strings (names, teams,
+positions, award names, selection types) live once in a string table and
+are referenced by id. Each player is a fixed-width record pointing at runs
+in the season, team, all-star, all-team, award and teammate sections.
+Values that don't fit those columns (non-integer seasons, extra season
+keys, unknown player keys) are kept verbatim in a per-player JSON extras
+string, so the snapshot decodes back to exactly the original records,
+less the name-keyed teammate_years maps older databases carry. Those
+are dropped as the JSON loader drops them: scoring derives teammate
+years from the seasons (teammate_graph.py), so the teammate section is
+left empty.
+
+The loader maps the file read-only and wraps the sections in NumPy views,
+so every worker reading the same snapshot shares its pages.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import subprocess
+import sys
+import time
+from collections.abc import Mapping
+
+import numpy as np
+
+from neighbor_index import database_hash
+from player_features import CompiledPlayer
+
+MAGIC = b"NBAMSNP1"
+SNAPSHOT_VERSION = 1
+ALIGN = 16
+NO_STRING = 0xFFFFFFFF
+
+PLAYER_DTYPE = np.dtype([
+    ("name", "<u4"), ("present", "<u4"), ("extras", "<u4"), ("position", "<u4"),
+    ("start_year", "<i4"), ("career_length", "<i4"), ("draft_year", "<i4"),
+    ("seasons", "<u4"), ("n_seasons", "<u4"),
+    ("teams", "<u4"), ("n_teams", "<u4"),
+    ("all_star", "<u4"), ("n_all_star", "<u4"),
+    ("all_team", "<u4"), ("n_all_team", "<u4"),
+    ("awards", "<u4"), ("n_awards", "<u4"),
+    ("teammates", "<u4"), ("n_teammates", "<u4"),
+])
+SEASON_DTYPE = np.dtype([("team", "<u4"), ("season", "<i4")])
+ALL_TEAM_DTYPE = np.dtype([("season", "<i4"), ("type", "<u4")])
+TEAMMATE_DTYPE = np.dtype([("name", "<u4"), ("years", "<i4")])
+
+# Bits of PLAYER_DTYPE["present"]: which keys the original record had
+FIELDS = ("position", "start_year", "career_length", "draft_year", "seasons", "teams",
+          "all_star_seasons", "all_team_selections", "awards_won", "teammate_years")
+PRESENT = {field: 1 << bit for bit, field in enumerate(FIELDS)}
+
+
+def default_snapshot_path(db_path):
+    root, _ = os.path.splitext(db_path)
+    return root + ".snap"
+
+
+def _is_int32(value):
+    return type(value) is int and -2**31 <= value < 2**31
+
+
+def _fits(field, value):
+    """Whether a field's value can be stored in its fixed-width columns"""
+    if field == "position":
+        return isinstance(value, str)
+    if field in ("start_year", "career_length", "draft_year"):
+        return _is_int32(value)
+    if field == "seasons":
+        return isinstance(value, list) and all(
+            isinstance(s, dict) and s.keys() == {"team", "season"}
+            and isinstance(s["team"], str) and _is_int32(s["season"]) for s in value)
+    if field in ("teams", "awards_won"):
+        return isinstance(value, list) and all(isinstance(v, str) for v in value)
+    if field == "all_star_seasons":
+        return isinstance(value, list) and all(_is_int32(v) for v in value)
+    if field == "all_team_selections":
+        return isinstance(value, list) and all(
+            isinstance(s, dict) and s.keys() == {"season", "type"}
+            and _is_int32(s["season"]) and isinstance(s["type"], str) for s in value)
+    if field == "teammate_years":
+        return isinstance(value, dict) and all(_is_int32(v) for v in value.values())
+    return False
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids = {}
+        self.blobs = []
+
+    def add(self, text):
+        sid = self.ids.get(text)
+        if sid is None:
+            sid = self.ids[text] = len(self.blobs)
+            self.blobs.append(text.encode("utf-8"))
+        return sid
+
+    def arrays(self):
+        offsets = np.zeros(len(self.blobs) + 1, dtype="<u8")
+        np.cumsum([len(b) for b in self.blobs], out=offsets[1:])
+        return np.frombuffer(b"".join(self.blobs), dtype=np.uint8), offsets
+
+
+def build_snapshot(db_path, out_path):
+    with open(db_path, "rb") as f:
+        raw = f.read()
+    stat = os.stat(db_path)
+    players_db = json.loads(raw)
+
+    strings = _StringTable()
+    players = np.zeros(len(players_db), dtype=PLAYER_DTYPE)
+    seasons, teams, all_star, all_team, awards, teammates = [], [], [], [], [], []
+
+    for i, (name, player) in enumerate(players_db.items()):
+        rec = players[i]
+        rec["name"] = strings.add(name)
+        present = 0
+        extras = {}
+        for key, value in player.items():
+            if key == "teammate_years":
+                continue
+            if key not in PRESENT or not _fits(key, value):
+                extras[key] = value
+            else:
+                present |= PRESENT[key]
+        rec["present"] = present
+        rec["extras"] = strings.add(json.dumps(extras, ensure_ascii=False)) if extras else NO_STRING
+
+        def stored(field):
+            return present & PRESENT[field]
+
+        rec["position"] = strings.add(player["position"]) if stored("position") else NO_STRING
+        for field in ("start_year", "career_length", "draft_year"):
+            rec[field] = player[field] if stored(field) else 0
+
+        rec["seasons"] = len(seasons)
+        if stored("seasons"):
+            seasons.extend((strings.add(s["team"]), s["season"]) for s in player["seasons"])
+        rec["n_seasons"] = len(seasons) - rec["seasons"]
+
+        rec["teams"] = len(teams)
+        if stored("teams"):
+            teams.extend(strings.add(t) for t in player["teams"])
+        rec["n_teams"] = len(teams) - rec["teams"]
+
+        rec["all_star"] = len(all_star)
+        if stored("all_star_seasons"):
+            all_star.extend(player["all_star_seasons"])
+        rec["n_all_star"] = len(all_star) - rec["all_star"]
+
+        rec["all_team"] = len(all_team)
+        if stored("all_team_selections"):
+            all_team.extend((s["season"], strings.add(s["type"])) for s in player["all_team_selections"])
+        rec["n_all_team"] = len(all_team) - rec["all_team"]
+
+        rec["awards"] = len(awards)
+        if stored("awards_won"):
+            awards.extend(strings.add(a) for a in player["awards_won"])
+        rec["n_awards"] = len(awards) - rec["awards"]
+
+    blob, offsets = strings.arrays()
+    sections = {
+        "string_blob": blob,
+        "string_offsets": offsets,
+        "players": players,
+        "seasons": np.array(seasons, dtype=SEASON_DTYPE),
+        "teams": np.array(teams, dtype="<u4"),
+        "all_star": np.array(all_star, dtype="<i4"),
+        "all_team": np.array(all_team, dtype=ALL_TEAM_DTYPE),
+        "awards": np.array(awards, dtype="<u4"),
+        "teammates": np.array(teammates, dtype=TEAMMATE_DTYPE),
+    }
+
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "source": {"sha256": database_hash(raw), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns},
+        "sections": {},
+    }
+    # Header size depends on the offsets in it, so lay out with a fixed budget
+    header_budget = 4096
+    offset = len(MAGIC) + 4 + header_budget
+    for name, array in sections.items():
+        offset = -(-offset // ALIGN) * ALIGN
+        dtype = array.dtype.descr if array.dtype.names else array.dtype.str
+        header["sections"][name] = {"offset": offset, "count": len(array), "dtype": dtype}
+        offset += array.nbytes
+    header_bytes = json.dumps(header).encode("utf-8")
+    if len(header_bytes) > header_budget:
+        raise ValueError("snapshot header too large")
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes.ljust(header_budget, b" "))
+        for name, array in sections.items():
+            f.seek(header["sections"][name]["offset"])
+            f.write(array.tobytes())
+        # Trailing empty sections (e.g. no teammate maps) still need their offset in the file
+        f.truncate(offset)
+    os.replace(tmp_path, out_path)
+    return len(players)
+
+
+def _dtype(descr):
+    if isinstance(descr, str):
+        return np.dtype(descr)
+    return np.dtype([tuple(field) for field in descr])
+
+
+class PlayerSnapshot(Mapping):
+    """Read-only, memory-mapped player database with the same interface as the JSON dict.
+
+    Looking a player up decodes a fresh dict from the mapped arrays; nothing
+    per-player is retained, so the only per-worker cost is the name index.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a player snapshot")
+        (header_len,) = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mmap[start:start + header_len])
+        if header["version"] != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} has unsupported snapshot version {header['version']}")
+
+        self.path = path
+        self.source = header["source"]
+        self.db_hash = self.source["sha256"]
+        self.sections = {
+            name: np.frombuffer(self._mmap, dtype=_dtype(info["dtype"]), count=info["count"],
+                                offset=info["offset"])
+            for name, info in header["sections"].items()
+        }
+        self._blob = self.sections["string_blob"]
+        self._offsets = self.sections["string_offsets"]
+        self._strings = {}
+
+        self.players = self.sections["players"]
+        self.names = [self._decode(sid) for sid in self.players["name"].tolist()]
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+    def _decode(self, sid):
+        start, end = int(self._offsets[sid]), int(self._offsets[sid + 1])
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+    def string(self, sid):
+        """Decode a shared string (team, position, award...), memoized"""
+        text = self._strings.get(sid)
+        if text is None:
+            text = self._strings[sid] = self._decode(sid)
+        return text
+
+    def matches(self, db_path):
+        """Whether this snapshot was built from the JSON file as it is now"""
+        try:
+            stat = os.stat(db_path)
+        except FileNotFoundError:
+            return True
+        return stat.st_size == self.source["size"] and stat.st_mtime_ns == self.source["mtime_ns"]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __getitem__(self, name):
+        return self.record(self.index[name])
+
+    def record(self, i):
+        """Decode player `i` back into its original JSON shape"""
+        rec = self.players[i]
+        present = int(rec["present"])
+        s = self.sections
+        string = self.string
+        player = {}
+
+        def run(field, section):
+            start = int(rec[field])
+            return s[section][start:start + int(rec["n_" + field])]
+
+        if present & PRESENT["position"]:
+            player["position"] = string(int(rec["position"]))
+        for field in ("start_year", "career_length", "draft_year"):
+            if present & PRESENT[field]:
+                player[field] = int(rec[field])
+        if present & PRESENT["seasons"]:
+            player["seasons"] = [{"team": string(t), "season": y}
+                                 for t, y in run("seasons", "seasons").tolist()]
+        if present & PRESENT["teams"]:
+            player["teams"] = [string(t) for t in run("teams", "teams").tolist()]
+        if present & PRESENT["all_star_seasons"]:
+            player["all_star_seasons"] = run("all_star", "all_star").tolist()
+        if present & PRESENT["all_team_selections"]:
+            player["all_team_selections"] = [{"season": y, "type": string(t)}
+                                             for y, t in run("all_team", "all_team").tolist()]
+        if present & PRESENT["awards_won"]:
+            player["awards_won"] = [string(a) for a in run("awards", "awards").tolist()]
+        if rec["extras"] != NO_STRING:
+            player.update(json.loads(self._decode(int(rec["extras"]))))
+            # Snapshots built before teammate years were dropped may still have them
+            player.pop("teammate_years", None)
+        return player
+
+    def compile_features(self, team_codes):
+        """Compile every player for scoring in bulk, straight from the arrays"""
+        s = self.sections
+        players = self.players
+        cols = {field: players[field].tolist() for field in PLAYER_DTYPE.names}
+        season_teams = s["seasons"]["team"].tolist()
+        season_years = s["seasons"]["season"].tolist()
+        team_ids = s["teams"].tolist()
+        all_star = s["all_star"].tolist()
+        all_team = s["all_team"].tolist()
+        award_ids = s["awards"].tolist()
+
+        code_of = {}
+
+        def team_code(sid):
+            code = code_of.get(sid)
+            if code is None:
+                code = code_of[sid] = team_codes.code(self.string(sid))
+            return code
+
+        string = self.string
+
+        compiled = {}
+        for i, name in enumerate(self.names):
+            if cols["extras"][i] != NO_STRING:
+                # Something didn't fit the columns; take the general path
+                compiled[name] = CompiledPlayer(self.record(i), team_codes)
+                continue
+
+            a, n = cols["seasons"][i], cols["n_seasons"][i]
+            team_seasons = {}
+            for t, y in zip(season_teams[a:a + n], season_years[a:a + n]):
+                team_seasons.setdefault(team_code(t), set()).add(y)
+            a, n = cols["teams"][i], cols["n_teams"][i]
+            teams = [team_code(t) for t in team_ids[a:a + n]]
+            a, n = cols["all_star"][i], cols["n_all_star"][i]
+            stars = all_star[a:a + n]
+            a, n = cols["all_team"][i], cols["n_all_team"][i]
+            selections = [(y, string(t)) for y, t in all_team[a:a + n]]
+            a, n = cols["awards"][i], cols["n_awards"][i]
+            awards = [string(x) for x in award_ids[a:a + n]]
+
+            position = string(cols["position"][i]) if cols["present"][i] & PRESENT["position"] else ""
+            compiled[name] = CompiledPlayer.from_fields(
+                team_seasons, teams, position, cols["start_year"][i], cols["draft_year"][i],
+                cols["career_length"][i], stars, selections, awards)
+        return compiled
+
+
+def _memory_status():
+    """Resident and file-backed (shareable) memory of this process, in MB"""
+    status = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "RssAnon", "RssFile"):
+                    status[key] = int(value.split()[0]) / 1024
+    except OSError:
+        import resource
+        status["VmRSS"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return status
+
+
+def _measure(kind, path):
+    """Load one database the way a worker would and report time and memory"""
+    from player_features import compile_players
+
+    before = _memory_status()
+    started = time.perf_counter()
+    if kind == "json":
+        with open(path, "rb") as f:
+            players_db = json.loads(f.read())
+        # The backend drops these at load; teammates come from the rosters
+        for player in players_db.values():
+            player.pop("teammate_years", None)
+    else:
+        players_db = PlayerSnapshot(path)
+    loaded = time.perf_counter()
+    compiled, _ = compile_players(players_db)
+    compiled_at = time.perf_counter()
+    after = _memory_status()
+    print(json.dumps({
+        "loader": kind,
+        "players": len(players_db),
+        "load_s": round(loaded - started, 3),
+        "load_and_compile_s": round(compiled_at - started, 3),
+        "rss_mb": round(after.get("VmRSS", 0) - before.get("VmRSS", 0), 1),
+        "rss_anon_mb": round(after.get("RssAnon", 0) - before.get("RssAnon", 0), 1),
+        "rss_file_mb": round(after.get("RssFile", 0) - before.get("RssFile", 0), 1),
+    }))
+
+
+def report(db_path, snapshot_path):
+    """Cold-start time and RSS of both loaders, each in a fresh interpreter"""
+    print(f"{'loader':<10}{'players':>10}{'load s':>10}{'+compile s':>12}"
+          f"{'RSS MB':>10}{'anon MB':>10}{'shared MB':>11}")
+    for kind, path in (("json", db_path), ("snapshot", snapshot_path)):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), "_measure", kind, path],
+                             capture_output=True, text=True, check=True)
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{r['loader']:<10}{r['players']:>10}{r['load_s']:>10}{r['load_and_compile_s']:>12}"
+              f"{r['rss_mb']:>10}{r['rss_anon_mb']:>10}{r['rss_file_mb']:>11}")
+    print("Shared MB is file-backed memory: one copy serves every worker mapping the snapshot.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or inspect the binary player snapshot")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="convert players_awards.json to a snapshot")
+    build.add_argument("db", nargs="?", default="players_awards.json")
+    build.add_argument("out", nargs="?")
+    build.add_argument("--verify", action="store_true", help="check every record decodes back exactly")
+    rep = sub.add_parser("report", help="compare startup time and memory of both loaders")
+    rep.add_argument("db", nargs="?", default="players_awards.json")
+    rep.add_argument("snapshot", nargs="?")
+    measure = sub.add_parser("_measure")
+    measure.add_argument("kind")
+    measure.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        out_path = args.out or default_snapshot_path(args.db)
+        started = time.perf_counter()
+        count = build_snapshot(args.db, out_path)
+        print(f"✅ Wrote {count} players to {out_path} in {time.perf_counter() - started:.1f}s")
+        if args.verify:
+            with open(args.db, encoding="utf-8") as f:
+                original = json.load(f)
+            snapshot = PlayerSnapshot(out_path)
+            bad = [name for name in original if snapshot[name] != original[name]]
+            print(f"{'✅' if not bad else '❌'} {len(original) - len(bad)}/{len(original)} records round-trip")
+            if bad:
+                sys.exit(1)
+    elif args.command == "report":
+        report(args.db, args.snapshot or default_snapshot_path(args.db))
+    else:
+        _measure(args.kind, args.path)
@@ -0,0 +1,95 @@
+"""Streaming parser for the players JSON files, one record at a time.
+
+Used by clean_players.py and by the server's database loads. A record at a
+time never holds the GIL for long, unlike one json.loads of the whole file,
+and only a chunk of the file is in memory at once.
+"""
+import codecs
+import json
+
+WHITESPACE = " \t\n\r"
+
+
+def iter_players(f, source, chunk_size=1 << 20):
+    """Yield (name, record, raw JSON text) for each top-level entry of binary stream f"""
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        data = f.read(chunk_size)
+        if not data:
+            eof = True
+            utf8.decode(b"", final=True)
+            return False
+        buf = buf[pos:] + utf8.decode(data)
+        pos = 0
+        return True
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in WHITESPACE:
+                pos += 1
+            if pos < len(buf) or not fill():
+                return
+
+    def expect(chars):
+        nonlocal pos
+        skip_whitespace()
+        if pos >= len(buf) or buf[pos] not in chars:
+            found = buf[pos] if pos < len(buf) else "end of file"
+            raise ValueError(f"{source}: expected {' or '.join(chars)}, found {found!r}")
+        pos += 1
+        return buf[pos - 1]
+
+    def decode():
+        # A value ending exactly at the buffer edge may be cut short (e.g. a number)
+        nonlocal pos
+        skip_whitespace()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof or not fill():
+                    raise
+                continue
+            if end == len(buf) and not eof and fill():
+                continue
+            start, pos = pos, end
+            return value, buf[start:end]
+
+    expect("{")
+    skip_whitespace()
+    if pos < len(buf) and buf[pos] == "}":
+        return
+    while True:
+        name, _ = decode()
+        if not isinstance(name, str):
+            raise ValueError(f"{source}: player names must be strings")
+        expect(":")
+        value, raw = decode()
+        yield name, value, raw
+        if expect(",}") == "}":
+            return
+
+
+class HashingReader:
+    """Binary stream wrapper that feeds every byte read through it to `digest`"""
+
+    def __init__(self, f, digest):
+        self.f = f
+        self.digest = digest
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.digest.update(data)
+        return data
+
+    def drain(self, chunk_size=1 << 20):
+        """Read (and hash) the rest of the stream"""
+        while self.read(chunk_size):
+            pass
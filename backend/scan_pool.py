@@ -0,0 +1,116 @@
+"""Whole-database top-n scans in a pool of warm worker processes.
+
+A top-n scan is O(N) Python and NumPy work that holds the GIL for its whole
+run, so in a threaded server every cheap request queued behind it waits.
+ScanPool runs the scans in separate processes, each of which loads the
+player database once at startup and keeps it, and hands results back as
+awaitables. Workers check the database version of every task and reload
+when the server has moved to a newer database.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from candidate_search import top_n_pruned
+from player_database import PlayerDatabase
+from scoring_profiles import load_profiles
+
+
+class ScanTimeout(Exception):
+    """A scan didn't finish within the pool's timeout"""
+
+
+class StaleWorker(Exception):
+    """The worker can't load the database version or scoring profile the server has"""
+
+
+# Worker process state, set by _init_worker
+_load_args = None
+_database = None
+_profiles = None
+
+
+def _init_worker(load_args, profiles_path):
+    global _load_args, _database, _profiles
+    _load_args = load_args
+    _database = PlayerDatabase.load(*load_args)
+    _profiles = load_profiles(profiles_path)
+
+
+def _ping():
+    return _database.version
+
+
+def _top_n(version, target_key, n, profile_name, fingerprint):
+    global _database
+    if _database.version != version:
+        try:
+            _database = PlayerDatabase.load(*_load_args)
+        except (OSError, ValueError) as e:
+            raise StaleWorker(f"worker could not reload the database: {e}") from None
+        if _database.version != version:
+            raise StaleWorker(f"worker has database {_database.version}, server has {version}")
+    scoring = _profiles.get(profile_name)
+    if scoring is None or scoring.fingerprint != fingerprint:
+        raise StaleWorker(f"worker's scoring profile {profile_name!r} differs from the server's")
+    top = top_n_pruned(_database.engine, target_key, n, scoring)
+    if top is None:
+        top = _database.engine.top_n(target_key, n, scoring)
+    return top
+
+
+class ScanPool:
+    """Process pool for top-n scans.
+
+    `load_args` are PlayerDatabase.load's arguments, so workers load the same
+    files the server does. Workers are spawned rather than forked, since
+    the server process runs threads.
+    """
+
+    def __init__(self, size, timeout, load_args, profiles_path):
+        self.size = size
+        self.timeout = timeout
+        self.load_args = load_args
+        self.profiles_path = profiles_path
+        self.executor = None
+
+    def _executor(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                self.size, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker, initargs=(self.load_args, self.profiles_path))
+        return self.executor
+
+    async def start(self):
+        """Start every worker and wait until each has loaded the database"""
+        # Workers are spawned on demand, one per task with none idle
+        executor = self._executor()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(executor, _ping) for _ in range(self.size)))
+
+    async def top_n(self, version, target_key, n, scoring):
+        """Top-n for the target, or None when the caller should scan inline.
+
+        Raises ScanTimeout when the scan takes longer than the pool's timeout.
+        A scan already running when it times out still finishes in its worker.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor(), _top_n, version, target_key, n,
+                                      scoring.name, scoring.fingerprint)
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            raise ScanTimeout(f"top-{n} scan for {target_key!r} took over {self.timeout}s") from None
+        except StaleWorker as e:
+            print(f"Warning: scanning inline: {e}")
+            return None
+        except BrokenProcessPool as e:
+            print(f"Warning: scan pool failed ({e}); restarting it")
+            self.close(wait=False)
+            return None
+
+    def close(self, wait=True):
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU cache with request coalescing.
+
+    Concurrent misses on the same key share one computation: the first
+    caller computes while the rest wait on its Future. The cache is tied to
+    a database version: reset() moves it to a new one, and callers passing
+    any other version (a request still running on a replaced database)
+    compute without reading or filling it.
+    """
+
+    def __init__(self, max_size, version=None):
+        self.max_size = max_size
+        self.version = version
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def reset(self, version=None):
+        """Drop every entry, e.g. after the player database changes"""
+        with self._lock:
+            self._entries.clear()
+            # In-flight computations finish for their waiters but aren't stored
+            self._inflight.clear()
+            self.version = version
+
+    def peek(self, key, version=None):
+        """Cached value or None, without computing, counting or touching LRU order"""
+        if version is not None and version != self.version:
+            return None
+        with self._lock:
+            return self._entries.get(key)
+
+    def get_or_compute(self, key, compute, version=None):
+        if self.max_size <= 0 or (version is not None and version != self.version):
+            return compute()
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            pending = self._inflight.get(key)
+            if pending is None:
+                self.misses += 1
+                pending = self._inflight[key] = Future()
+                cache_version = self.version
+                owner = True
+            else:
+                self.coalesced += 1
+                owner = False
+        if not owner:
+            return pending.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                self._forget(key, pending)
+            pending.set_exception(e)
+            raise
+
+        with self._lock:
+            self._forget(key, pending)
+            if self.version == cache_version:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        pending.set_result(value)
+        return value
+
+    def _forget(self, key, pending):
+        if self._inflight.get(key) is pending:
+            del self._inflight[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
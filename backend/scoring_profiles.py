@@ -0,0 +1,284 @@
+"""Named scoring profiles: declarative component weights and thresholds.
+
+A profile is a list of components, each turning one raw pair feature (see
+player_features.PAIR_FEATURES) into points:
+
+    {"name": "start_year_diff", "feature": "start_diff", "within": [[0, 6], [5, 4], [10, 2]]}
+
+    at_least  [[threshold, points], ...]  first tier with feature >= threshold
+    within    [[max_diff, points], ...]   first tier with feature <= max_diff
+    per       points per unit of the feature, optionally capped by "max"
+    first_of  [[feature, points], ...]    points for the first true feature
+
+Optional keys: "requires": [feature, minimum] scores 0 unless that feature
+reaches the minimum, and "omit_zero" leaves the component out of the
+breakdown when it scores 0. The total is capped at "cap" (default 99).
+
+Each profile is compiled once into a scalar evaluator (score: one generated
+function with the features and tiers inlined, see ScoringProfile.source),
+a vectorized one over SimilarityEngine.components() (points) and an upper
+bound used by the pruned top-n search. Extra profiles can be added, or
+built-in ones replaced, with a JSON file of {"<name>": <profile>}.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from player_features import FEATURE_HELPERS, feature_expressions
+
+SHARED_SEASON_TIERS = [[6, 50], [4, 40], [2, 30], [1, 20]]
+TEAMMATE_TIERS = [[6, 15], [4, 10], [2, 6], [1, 3]]
+
+CLASSIC_SPEC = {
+    "description": "Roster overlap first, then position and era",
+    "components": [
+        {"name": "shared_seasons", "feature": "shared_seasons", "at_least": SHARED_SEASON_TIERS},
+        {"name": "shared_streak_bonus", "feature": "max_streak", "per": 2, "max": 10,
+         "requires": ["shared_seasons", 2]},
+        {"name": "teammate_years", "feature": "teammate_years", "at_least": TEAMMATE_TIERS},
+        {"name": "shared_teams", "feature": "team_overlap", "per": 2},
+        {"name": "team_tenure", "feature": "tenure", "per": 1},
+        {"name": "position_match", "first_of": [["position_exact", 8], ["position_prefix", 2]]},
+        {"name": "start_year_diff", "feature": "start_diff", "within": [[0, 6], [5, 4], [10, 2]]},
+        {"name": "shared_all_star", "feature": "shared_all_star", "per": 3, "omit_zero": True},
+        {"name": "shared_all_team", "feature": "shared_all_team", "per": 3, "omit_zero": True},
+        {"name": "shared_awards", "feature": "shared_awards", "per": 5, "omit_zero": True},
+    ],
+}
+
+AWARDS_SPEC = {
+    "description": "Classic roster scoring plus draft class and career shape, lighter award weights",
+    "components": [
+        {"name": "shared_seasons", "feature": "shared_seasons", "at_least": SHARED_SEASON_TIERS},
+        {"name": "shared_streak_bonus", "feature": "max_streak", "per": 2, "max": 10,
+         "requires": ["shared_seasons", 2]},
+        {"name": "teammate_years", "feature": "teammate_years", "at_least": TEAMMATE_TIERS},
+        {"name": "shared_teams", "feature": "team_overlap", "per": 2},
+        {"name": "team_tenure", "feature": "tenure", "per": 1},
+        {"name": "position_match", "first_of": [["position_exact", 8], ["position_prefix", 2]]},
+        {"name": "draft_year_diff", "feature": "draft_diff", "within": [[1, 3], [3, 2]]},
+        {"name": "start_year_diff", "feature": "start_diff", "within": [[5, 4], [10, 2]]},
+        {"name": "career_end_proximity", "feature": "end_diff", "within": [[3, 2]]},
+        {"name": "career_length_diff", "feature": "career_length_diff", "within": [[3, 2], [5, 1]]},
+        {"name": "shared_all_star", "feature": "shared_all_star", "per": 2, "omit_zero": True},
+        {"name": "shared_all_team", "feature": "shared_all_team", "per": 2, "omit_zero": True},
+        {"name": "shared_awards", "feature": "shared_awards", "per": 1, "omit_zero": True},
+    ],
+}
+
+KINDS = ("at_least", "within", "per", "first_of")
+
+
+def _points(value, where):
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise ValueError(f"{where}: points must be non-negative integers, got {value!r}")
+    return value
+
+
+def _pairs(spec, kind, name):
+    pairs = spec[kind]
+    if not isinstance(pairs, list) or not pairs:
+        raise ValueError(f"Component {name!r}: {kind} needs a non-empty list of pairs")
+    first_type = str if kind == "first_of" else (int, float)
+    for first, _ in pairs:
+        if not isinstance(first, first_type) or isinstance(first, bool):
+            raise ValueError(f"Component {name!r}: invalid {kind} entry {first!r}")
+    return tuple((first, _points(pts, f"Component {name!r}")) for first, pts in pairs)
+
+
+class Component:
+    """One profile component, as a Python expression, a vectorized function and an upper bound"""
+
+    def __init__(self, spec):
+        self.name = spec.get("name")
+        if not isinstance(self.name, str) or not self.name or self.name == "total":
+            raise ValueError(f"Invalid component name: {self.name!r}")
+        kinds = [kind for kind in KINDS if kind in spec]
+        if len(kinds) != 1:
+            raise ValueError(f"Component {self.name!r} needs exactly one of {', '.join(KINDS)}")
+        self.kind = kinds[0]
+        self.omit_zero = bool(spec.get("omit_zero", False))
+        requires = spec.get("requires")
+        if requires and not (isinstance(requires, list) and len(requires) == 2 and isinstance(requires[0], str)
+                             and isinstance(requires[1], (int, float)) and not isinstance(requires[1], bool)):
+            raise ValueError(f"Component {self.name!r}: requires must be [feature, minimum], got {requires!r}")
+        self.requires = tuple(requires) if requires else None
+
+        if self.kind == "first_of":
+            self.choices = _pairs(spec, "first_of", self.name)
+            self.features = tuple(feature for feature, _ in self.choices)
+            self.max_points = max(pts for _, pts in self.choices)
+        else:
+            self.feature = spec.get("feature")
+            if not isinstance(self.feature, str):
+                raise ValueError(f"Component {self.name!r} needs a feature")
+            self.features = (self.feature,)
+            if self.kind == "per":
+                self.per = _points(spec["per"], f"Component {self.name!r}")
+                self.max = _points(spec["max"], f"Component {self.name!r}") if "max" in spec else None
+                self.max_points = self.max
+            else:
+                self.tiers = _pairs(spec, self.kind, self.name)
+                self.max_points = max(pts for _, pts in self.tiers)
+        if self.requires is not None:
+            self.features += (self.requires[0],)
+
+    def expression(self):
+        """Python expression for this component's points, over feature variables"""
+        if self.kind == "first_of":
+            expr = self._chain((f"{pts} if {feature}" for feature, pts in self.choices))
+        elif self.kind == "per":
+            expr = f"{self.feature} * {self.per}"
+            if self.max is not None:
+                expr = f"min({expr}, {self.max})"
+        else:
+            op = ">=" if self.kind == "at_least" else "<="
+            expr = self._chain((f"{pts} if {self.feature} {op} {limit!r}" for limit, pts in self.tiers))
+        if self.requires is not None:
+            required, minimum = self.requires
+            expr = f"({expr}) if {required} >= {minimum!r} else 0"
+        return expr
+
+    @staticmethod
+    def _chain(branches):
+        return " else ".join(branches) + " else 0"
+
+    def vector(self, c):
+        kind = self.kind
+        if kind == "first_of":
+            pts = np.select([c[feature] for feature, _ in self.choices], [p for _, p in self.choices], 0)
+        elif kind == "per":
+            pts = c[self.feature] * self.per
+            if self.max is not None:
+                pts = np.minimum(pts, self.max)
+        elif kind == "at_least":
+            values = c[self.feature]
+            pts = np.select([values >= t for t, _ in self.tiers], [p for _, p in self.tiers], 0)
+        else:
+            values = c[self.feature]
+            pts = np.select([values <= t for t, _ in self.tiers], [p for _, p in self.tiers], 0)
+        if self.requires is not None:
+            required, minimum = self.requires
+            pts = np.where(c[required] >= minimum, pts, 0)
+        return pts
+
+    def bound(self, upper, cap):
+        """Most this component can score given per-feature upper bounds (missing = unknown)"""
+        kind = self.kind
+        if kind == "per" and self.feature in upper:
+            pts = upper[self.feature] * self.per
+            if self.max is not None:
+                pts = np.minimum(pts, self.max)
+        elif kind == "at_least" and self.feature in upper:
+            # The matched tier's threshold is at most the feature's upper bound
+            pts = 0
+            for threshold, tier_pts in self.tiers:
+                pts = np.maximum(pts, np.where(upper[self.feature] >= threshold, tier_pts, 0))
+        elif self.max_points is None:
+            pts = cap
+        else:
+            pts = self.max_points
+        if self.requires is not None and self.requires[0] in upper:
+            required, minimum = self.requires
+            pts = np.where(upper[required] >= minimum, pts, 0)
+        return pts
+
+
+class ScoringProfile:
+    def __init__(self, name, spec):
+        components = spec.get("components")
+        if not isinstance(components, list) or not components:
+            raise ValueError(f"Profile {name!r} needs a non-empty components list")
+        self.name = name
+        self.description = spec.get("description", "")
+        self.cap = _points(spec.get("cap", 99), f"Profile {name!r} cap")
+        self.components = tuple(Component(c) for c in components)
+        names = [c.name for c in self.components]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Profile {name!r} has duplicate component names")
+        features = []
+        for component in self.components:
+            features.extend(f for f in component.features if f not in features)
+        self.features = feature_expressions(features)
+        self.spec = {"description": self.description, "cap": self.cap, "components": components}
+        # Identifies the exact weights, so derived artifacts can't outlive an edit
+        self.fingerprint = hashlib.sha256(json.dumps(
+            {"cap": self.cap, "components": components}, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        self.source = self._source(timed=False)
+        self.score = self._compile(self.source)
+        self.score_timed = self._compile(self._source(timed=True))
+
+    def _source(self, timed):
+        """Source of score(player1, player2) -> (total, breakdown).
+
+        The timed variant also takes (timings, clock) and adds each feature's
+        and the points step's elapsed clock() time to `timings`.
+        """
+        lines = [f"def score(player1, player2{', timings=None, clock=None' if timed else ''}):"]
+        for name, expression in self.features:
+            if timed:
+                lines.append("    started = clock()")
+            lines.append(f"    {name} = {expression}")
+            if timed:
+                lines.append(f"    timings[{name!r}] = timings.get({name!r}, 0) + clock() - started")
+        if timed:
+            lines.append("    started = clock()")
+        lines += ["    score = 0", "    breakdown = {}"]
+        for component in self.components:
+            lines.append(f"    pts = {component.expression()}")
+            if component.omit_zero:
+                lines += ["    if pts:", f"        breakdown[{component.name!r}] = pts", "        score += pts"]
+            else:
+                lines += [f"    breakdown[{component.name!r}] = pts", "    score += pts"]
+        lines += [f"    total = min(score, {self.cap})", '    breakdown["total"] = total']
+        if timed:
+            lines.append('    timings["points"] = timings.get("points", 0) + clock() - started')
+        lines.append("    return total, breakdown")
+        return "\n".join(lines) + "\n"
+
+    def _compile(self, source):
+        namespace = dict(FEATURE_HELPERS)
+        exec(compile(source, f"<scoring profile {self.name}>", "exec"), namespace)
+        return namespace["score"]
+
+    def points(self, c):
+        """Totals for every player from SimilarityEngine.components() arrays"""
+        score = self.components[0].vector(c)
+        for component in self.components[1:]:
+            score = score + component.vector(c)
+        return np.minimum(score, self.cap)
+
+    def upper_bound(self, upper):
+        """Upper bound on the total given upper bounds for some features"""
+        bound = 0
+        for component in self.components:
+            bound = bound + component.bound(upper, self.cap)
+        return np.minimum(bound, self.cap)
+
+
+BUILTIN_PROFILES = {
+    "classic": ScoringProfile("classic", CLASSIC_SPEC),
+    "awards": ScoringProfile("awards", AWARDS_SPEC),
+}
+CLASSIC = BUILTIN_PROFILES["classic"]
+
+
+def load_profiles(path=None):
+    """Built-in profiles plus any defined in the JSON file at `path`"""
+    profiles = dict(BUILTIN_PROFILES)
+    if not path or not os.path.exists(path):
+        return profiles
+    try:
+        with open(path, encoding="utf-8") as f:
+            specs = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not read scoring profiles {path}: {e}")
+        return profiles
+    for name, spec in specs.items():
+        try:
+            profiles[name] = ScoringProfile(name, spec)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Warning: skipping scoring profile {name!r}: {e}")
+    return profiles
@@ -0,0 +1,235 @@
+import atexit
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS game_sessions (
+    id TEXT PRIMARY KEY,
+    target TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    created REAL NOT NULL,
+    guesses INTEGER NOT NULL DEFAULT 0,
+    finished INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS game_sessions_created ON game_sessions (created);
+"""
+
+# Progress only moves forward, so a late or repeated write never undoes a newer one
+UPSERT = """
+INSERT INTO game_sessions (id, target, profile, created, guesses, finished) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    guesses = MAX(guesses, excluded.guesses),
+    finished = MAX(finished, excluded.finished)
+"""
+
+# Seconds between deletions of expired games from the file
+PURGE_INTERVAL = 60
+
+
+class GameSession:
+    """One game: its target, resolved when the game was created, and progress so far"""
+
+    __slots__ = ("game_id", "target_key", "profile", "created", "guesses", "finished", "version", "top_5")
+
+    def __init__(self, game_id, target_key, profile, created, guesses=0, finished=False):
+        self.game_id = game_id
+        self.target_key = target_key
+        self.profile = profile
+        self.created = created
+        self.guesses = guesses
+        self.finished = finished
+        # Database version and Future of the background top-5, set by the server
+        self.version = None
+        self.top_5 = None
+
+
+class SessionStore:
+    """In-memory game sessions, bounded by size (LRU) and age (TTL), saved to SQLite.
+
+    Game IDs are random, so they reveal nothing about the target. Requests
+    only touch memory: creating a game, counting a guess or finishing it
+    marks the session for saving, and a background thread per worker
+    writes the marked sessions to SQLite every `flush_interval` seconds in
+    one transaction, as GameStats does. A game this worker doesn't hold
+    (evicted, created before a restart, or served by another worker) is
+    read back from the file, with the progress saved at the last flush.
+    Several workers need sticky routing per game for exact guess counts.
+    """
+
+    def __init__(self, max_size, ttl, path, flush_interval=5.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.flush_interval = flush_interval
+        self._sessions = OrderedDict()
+        self._dirty = {}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._wakeup = threading.Event()
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._purged = 0
+        self.created = 0
+        self.restored = 0
+        self.expired = 0
+        self.evictions = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        atexit.register(self.flush)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ensure_flusher(self):
+        # Started lazily so each forked gunicorn worker gets its own thread
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                with self._lock:
+                    self._dirty = {}
+                threading.Thread(target=self._run, name="game-session-flusher", daemon=True).start()
+                self._pid = os.getpid()
+
+    def create(self, target_key, profile):
+        """Start a session; returns (game_id, session)"""
+        self._ensure_flusher()
+        game_id = secrets.token_urlsafe(16)
+        created = time.time()
+        session = GameSession(game_id, target_key, profile, created)
+        with self._lock:
+            self.created += 1
+            self._insert(session, created)
+            self._dirty[game_id] = session
+        return game_id, session
+
+    def get(self, game_id):
+        """The live session for game_id, or None if it is unknown or expired"""
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(game_id)
+            if session is not None:
+                if now - session.created < self.ttl:
+                    self._sessions.move_to_end(game_id)
+                    return session
+                del self._sessions[game_id]
+                self.expired += 1
+                return None
+
+        row = self._load(game_id, now)
+        if row is None:
+            return None
+        target_key, profile, created, guesses, finished = row
+        with self._lock:
+            session = self._sessions.get(game_id)
+            if session is None:
+                session = GameSession(game_id, target_key, profile, created, guesses, bool(finished))
+                self.restored += 1
+                self._insert(session, now)
+            return session
+
+    def _load(self, game_id, now):
+        try:
+            with self._connect() as conn:
+                return conn.execute(
+                    "SELECT target, profile, created, guesses, finished FROM game_sessions "
+                    "WHERE id = ? AND created > ?", (game_id, now - self.ttl)).fetchone()
+        except sqlite3.Error as e:
+            print(f"Warning: could not read game session: {e}")
+            return None
+
+    def record_guess(self, session, solved=False):
+        """Count a guess, finishing the game if solved; False if it was already finished"""
+        self._ensure_flusher()
+        with self._lock:
+            if session.finished:
+                return False
+            session.guesses += 1
+            session.finished = solved
+            self._dirty[session.game_id] = session
+            return True
+
+    def finish(self, session):
+        """Mark the game finished; True if this call finished it"""
+        self._ensure_flusher()
+        with self._lock:
+            if session.finished:
+                return False
+            session.finished = True
+            self._dirty[session.game_id] = session
+            return True
+
+    def _insert(self, session, now):
+        self._sessions[session.game_id] = session
+        # Least recently used first, so expired sessions mostly sit at the front
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if now - oldest.created < self.ttl:
+                break
+            del self._sessions[oldest_id]
+            self.expired += 1
+        while len(self._sessions) > self.max_size:
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+    def _run(self):
+        while not self._wakeup.wait(self.flush_interval):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Warning: could not flush game sessions: {e}")
+
+    def flush(self):
+        """Write every session changed since the last flush to SQLite as one batch"""
+        with self._flush_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, {}
+                rows = [(s.game_id, s.target_key, s.profile, s.created, s.guesses, int(s.finished))
+                        for s in dirty.values()]
+            now = time.time()
+            purge = now - self._purged >= PURGE_INTERVAL
+            if not rows and not purge:
+                return 0
+            try:
+                with self._connect() as conn:
+                    conn.executemany(UPSERT, rows)
+                    if purge:
+                        conn.execute("DELETE FROM game_sessions WHERE created <= ?", (now - self.ttl,))
+            except sqlite3.Error:
+                # Keep the batch for the next flush, unless newer changes replaced it
+                with self._lock:
+                    for game_id, session in dirty.items():
+                        self._dirty.setdefault(game_id, session)
+                raise
+            if purge:
+                self._purged = now
+            return len(rows)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._sessions),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "created": self.created,
+                "restored": self.restored,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "pending_writes": len(self._dirty),
+            }
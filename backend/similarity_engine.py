@@ -0,0 +1,212 @@
+import numpy as np
+
+from player_features import SEASON_BITS, SEASON_MASK, season_key
+from scoring_profiles import CLASSIC
+from teammate_graph import TeammateGraph
+
+
+class Postings:
+    """Column-wise (CSC) incidence matrix: key -> sorted array of player rows"""
+
+    def __init__(self, rows_of_keys, size):
+        columns = {}
+        cols = []
+        rows = []
+        values = []
+        for row, keys in enumerate(rows_of_keys):
+            for key, value in keys:
+                col = columns.get(key)
+                if col is None:
+                    col = columns[key] = len(columns)
+                cols.append(col)
+                rows.append(row)
+                values.append(value)
+
+        cols = np.asarray(cols, dtype=np.int64)
+        order = np.argsort(cols, kind="stable")
+        self.columns = columns
+        self.size = size
+        self.rows = np.asarray(rows, dtype=np.int32)[order]
+        self.values = np.asarray(values, dtype=np.int32)[order]
+        self.ptr = np.zeros(len(columns) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=len(columns)), out=self.ptr[1:])
+
+    @classmethod
+    def from_sets(cls, key_sets, size):
+        return cls(([(key, 1) for key in keys] for keys in key_sets), size)
+
+    def _slices(self, keys):
+        for key in keys:
+            col = self.columns.get(key)
+            if col is not None:
+                yield self.ptr[col], self.ptr[col + 1]
+
+    def rows_for(self, keys):
+        """Rows of every player holding any of the keys (with repeats)"""
+        parts = [self.rows[start:end] for start, end in self._slices(keys)]
+        if not parts:
+            return np.empty(0, dtype=np.int32)
+        return np.concatenate(parts)
+
+    def values_for(self, key):
+        """(rows, values) for a single key"""
+        for start, end in self._slices((key,)):
+            return self.rows[start:end], self.values[start:end]
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+
+    def counts(self, keys):
+        """Per-player number of keys shared with `keys`, as a dense vector"""
+        return np.bincount(self.rows_for(keys), minlength=self.size)
+
+    def mask(self, keys):
+        hit = np.zeros(self.size, dtype=bool)
+        hit[self.rows_for(keys)] = True
+        return hit
+
+
+def _local_counts(rows, subset):
+    """Count rows that fall in the sorted `subset`, indexed by position in subset"""
+    local = np.searchsorted(subset, rows)
+    if len(subset):
+        hit = local < len(subset)
+        hit[hit] = subset[local[hit]] == rows[hit]
+        local = local[hit]
+    else:
+        local = local[:0]
+    return np.bincount(local, minlength=len(subset))
+
+
+def _codes(values):
+    table = {}
+    codes = np.asarray([table.setdefault(v, len(table)) for v in values], dtype=np.int32)
+    return codes, table
+
+
+class SimilarityEngine:
+    """Scores one target against every player in a single vectorized pass"""
+
+    def __init__(self, compiled_players):
+        self.names = list(compiled_players)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.players = [compiled_players[name] for name in self.names]
+        players = self.players
+        size = len(players)
+        self.size = size
+
+        # Team-season incidence matrix and franchise membership (from "teams")
+        self.seasons = Postings.from_sets((p.season_keys for p in players), size)
+        self.teams = Postings.from_sets((p.teams for p in players), size)
+
+        # Teammate years, shared with the scalar scorer when compile_players built it
+        graph = players[0].graph if players else None
+        if graph is None or len(graph) != size or any(p.graph is not graph or p.row != i
+                                                     for i, p in enumerate(players)):
+            graph = TeammateGraph.from_season_keys((p.season_keys for p in players), SEASON_BITS)
+        self.teammates = graph
+
+        self.all_stars = Postings.from_sets((p.all_star_seasons for p in players), size)
+        self.all_teams = Postings.from_sets((p.all_team_selections for p in players), size)
+        self.awards = Postings.from_sets((p.awards_won for p in players), size)
+
+        self.position, self.position_table = _codes(p.position for p in players)
+        self.position_prefix, self.prefix_table = _codes(p.position_prefix for p in players)
+        self.start_year = np.asarray([p.start_year for p in players], dtype=np.int64)
+        self.draft_year = np.asarray([p.draft_year for p in players], dtype=np.int64)
+        self.career_length = np.asarray([p.career_length for p in players], dtype=np.int64)
+
+    def components(self, target, target_name=None):
+        """Raw per-player similarity inputs against `target` (a compiled player)"""
+        size = self.size
+        seasons = self.seasons
+
+        # Shared seasons
+        shared = seasons.counts(target.season_keys)
+
+        # Longest run of consecutive shared seasons, only for players sharing 2+
+        streak_rows = np.flatnonzero(shared >= 2)
+        max_streak = np.ones(len(streak_rows), dtype=np.int64)
+        if len(streak_rows):
+            by_year = {}
+            for key in target.season_keys:
+                by_year.setdefault(key & SEASON_MASK, []).append(key)
+            streak = np.ones(len(streak_rows), dtype=np.int64)
+            prev = np.full(len(streak_rows), -2, dtype=np.int64)
+            for year in sorted(by_year):
+                count = _local_counts(seasons.rows_for(by_year[year]), streak_rows)
+                present = count > 0
+                streak = np.where(present, np.where(prev == year - 1, streak + 1, 1), streak)
+                np.maximum(max_streak, streak, out=max_streak)
+                # A season shared on two teams breaks the run, as in the scalar scorer
+                streak[count >= 2] = 1
+                prev[present] = year
+        streak_full = np.ones(size, dtype=np.int64)
+        streak_full[streak_rows] = max_streak
+
+        # Teammate years: the target's row of the graph, or per season for an outside player
+        teammate_years = np.zeros(size, dtype=np.int64)
+        if target.graph is self.teammates:
+            rows, years = self.teammates.neighbors(target.row)
+            teammate_years[rows] = years
+        else:
+            by_year = {}
+            for key in target.season_keys:
+                by_year.setdefault(key & SEASON_MASK, []).append(key)
+            for keys in by_year.values():
+                teammate_years += seasons.mask(keys)
+
+        # Shared franchises and tenure on each of them
+        team_overlap = self.teams.counts(target.teams)
+        tenure = np.zeros(size, dtype=np.int64)
+        tenure_rows = np.flatnonzero(shared)
+        if len(tenure_rows):
+            local_tenure = np.zeros(len(tenure_rows), dtype=np.int64)
+            for team in target.teams:
+                years = target.team_seasons.get(team)
+                if not years:
+                    continue
+                on_team = _local_counts(seasons.rows_for(season_key(team, y) for y in years), tenure_rows)
+                member = _local_counts(self.teams.rows_for((team,)), tenure_rows) > 0
+                local_tenure += np.minimum(on_team, 3) * member
+            tenure[tenure_rows] = local_tenure
+
+        return {
+            "shared_seasons": shared,
+            "max_streak": streak_full,
+            "teammate_years": teammate_years,
+            "team_overlap": team_overlap,
+            "tenure": tenure,
+            "position_exact": self.position == self.position_table.get(target.position, -1),
+            "position_prefix": self.position_prefix == self.prefix_table.get(target.position_prefix, -1),
+            "start_diff": np.abs(self.start_year - target.start_year),
+            "draft_diff": np.abs(self.draft_year - target.draft_year),
+            "end_diff": np.abs((self.start_year + self.career_length)
+                               - (target.start_year + target.career_length)),
+            "career_length_diff": np.abs(self.career_length - target.career_length),
+            "shared_all_star": self.all_stars.mask(target.all_star_seasons),
+            "shared_all_team": self.all_teams.mask(target.all_team_selections),
+            "shared_awards": self.awards.mask(target.awards_won),
+        }
+
+    def score_all(self, target_name, profile=None, target=None):
+        """Score every player (as player1) against the target (as player2)"""
+        if target is None:
+            target = self.players[self.index[target_name]]
+        return (profile or CLASSIC).points(self.components(target, target_name))
+
+    def top_n(self, target_name, n=5, profile=None, target=None):
+        """Best `n` (name, score) pairs, ties broken by database order"""
+        scores = self.score_all(target_name, profile, target)
+        return [(self.names[i], int(scores[i])) for i in self.best(scores, n, self.index.get(target_name))]
+
+    def best(self, scores, n, exclude=None):
+        """Row indices of the `n` highest scores, ties broken by database order"""
+        if exclude is not None:
+            scores = scores.copy()
+            scores[exclude] = -1
+        candidates = np.arange(self.size)
+        if self.size > n:
+            kth = np.partition(scores, self.size - n)[self.size - n]
+            candidates = np.flatnonzero(scores >= kth)
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [int(i) for i in order if i != exclude][:n]
+
@@ -0,0 +1,139 @@
+"""Static files of the React build, served from a manifest built at startup.
+
+    python static_assets.py [build]     # write .gz variants next to the build's files
+
+Run it as a step of the backend's deploy, once the React build has been
+copied to STATIC_DIR. Not from `npm run build`: that build is also what
+Firebase Hosting uploads, which compresses on its own and would upload
+every .gz copy as a file.
+
+StaticAssets walks the build directory once and keeps, per URL path, the
+file's content type, ETag and precompressed gzip variant, so serving a file
+is a dict lookup with no filesystem checks. Files with a content hash in
+their name (everything CRA puts under static/) never change and are cached
+as immutable; anything else, index.html included, is revalidated with its
+ETag. Restart the server after deploying a new build.
+"""
+import argparse
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import sys
+
+from flask import Response, send_file
+
+# CRA names bundles like main.3f2a1b9c.js and 453.1a2b3c4d.chunk.js
+HASHED_NAME = re.compile(r"\.[0-9a-f]{8,}\.")
+COMPRESSIBLE = (".js", ".css", ".map", ".html", ".json", ".svg", ".txt")
+# Smaller files don't gain enough to be worth a second copy
+MIN_GZIP_SIZE = 1024
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+class Asset:
+    """One file of the build, and its gzip variant if there is an up-to-date one"""
+
+    __slots__ = ("path", "content_type", "etag", "immutable", "gzip_path", "gzip_etag")
+
+    def __init__(self, path, name):
+        self.path = path
+        self.content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        self.etag = digest
+        self.immutable = HASHED_NAME.search(name) is not None
+        self.gzip_path = None
+        self.gzip_etag = None
+        gz_path = path + ".gz"
+        if os.path.exists(gz_path):
+            if os.path.getmtime(gz_path) >= os.path.getmtime(path):
+                self.gzip_path = gz_path
+                self.gzip_etag = digest + "-gzip"
+            else:
+                print(f"Warning: ignoring {gz_path}, it is older than {path}")
+
+
+class StaticAssets:
+    """Every file under `root`, keyed by URL path relative to it"""
+
+    def __init__(self, root):
+        self.root = root
+        self.assets = {}
+        for directory, _, files in os.walk(root):
+            for name in files:
+                if name.endswith(".gz"):
+                    continue
+                path = os.path.join(directory, name)
+                key = os.path.relpath(path, root).replace(os.sep, "/")
+                self.assets[key] = Asset(path, name)
+
+    def __len__(self):
+        return len(self.assets)
+
+    def get(self, path):
+        return self.assets.get(path)
+
+
+def asset_response(asset, request):
+    """Serve an asset, gzipped when the client accepts it, honoring If-None-Match"""
+    gzipped = asset.gzip_path is not None and request.accept_encodings["gzip"]
+    etag = asset.gzip_etag if gzipped else asset.etag
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = send_file(asset.gzip_path if gzipped else asset.path, mimetype=asset.content_type,
+                             download_name=os.path.basename(asset.path), conditional=False, etag=False)
+        if gzipped:
+            response.headers["Content-Encoding"] = "gzip"
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE if asset.immutable else "no-cache"
+    if asset.gzip_path is not None:
+        response.vary.add("Accept-Encoding")
+    return response
+
+
+def compress_build(root, level=9):
+    """Write a .gz next to every compressible file that lacks an up-to-date one.
+
+    Returns (files compressed, bytes before, bytes after).
+    """
+    count = before = after = 0
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            if not name.endswith(COMPRESSIBLE) or os.path.getsize(path) < MIN_GZIP_SIZE:
+                continue
+            gz_path = path + ".gz"
+            if os.path.exists(gz_path) and os.path.getmtime(gz_path) >= os.path.getmtime(path):
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            compressed = gzip.compress(data, compresslevel=level, mtime=0)
+            if len(compressed) >= len(data):
+                continue
+            with open(gz_path + ".tmp", "wb") as f:
+                f.write(compressed)
+            os.replace(gz_path + ".tmp", gz_path)
+            count += 1
+            before += len(data)
+            after += len(compressed)
+    return count, before, after
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write gzip variants of a React build's assets")
+    parser.add_argument("build", nargs="?", default="build", help="build directory (default: build)")
+    parser.add_argument("--level", type=int, default=9, help="gzip compression level (default: 9)")
+    args = parser.parse_args()
+    if not os.path.isdir(args.build):
+        print(f"Error: {args.build} is not a directory")
+        return 1
+    count, before, after = compress_build(args.build, args.level)
+    print(f"Compressed {count} files: {before / 1024:.1f} KB -> {after / 1024:.1f} KB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import secrets
+
+import numpy as np
+
+from score_cache import LRUCache
+
+
+class TargetIndex:
+    """Players indexed by the summary fields clients filter targets on.
+
+    start_year and career_length are sorted: a range is two binary searches
+    and a contiguous run of player ids. Positions (each part of e.g. "SG-SF")
+    and teams are bitmaps, one per value, OR-ed within a field. Fields are
+    AND-ed. A filter's matching ids are built once and cached, so drawing a
+    target is one random index into them.
+    """
+
+    def __init__(self, summary, cache_size=256):
+        self.names = list(summary)
+        rows = [summary[name] for name in self.names]
+        self.ranges = {}
+        for field in ("start_year", "career_length"):
+            values = np.fromiter((row.get(field) or 0 for row in rows), dtype=np.int32, count=len(rows))
+            order = np.argsort(values, kind="stable").astype(np.int32)
+            self.ranges[field] = (values[order], order)
+
+        positions = {}
+        teams = {}
+        for i, row in enumerate(rows):
+            for part in (row.get("position") or "").split("-"):
+                if part:
+                    positions.setdefault(part.upper(), []).append(i)
+            for team in set(row.get("teams") or ()):
+                teams.setdefault(team.upper(), []).append(i)
+        self.bitmaps = {"position": self._bitmaps(positions), "team": self._bitmaps(teams)}
+        self.matches = LRUCache(cache_size)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _bitmaps(self, members):
+        bitmaps = {}
+        for value, ids in members.items():
+            bits = np.zeros(len(self.names), dtype=bool)
+            bits[ids] = True
+            bitmaps[value] = np.packbits(bits)
+        return bitmaps
+
+    def match(self, ranges=(), sets=()):
+        """Ids of players matching every filter, cached per filter.
+
+        `ranges` holds (field, low, high) with None for an open end; `sets`
+        holds (field, values).
+        """
+        key = (tuple(sorted(ranges)), tuple(sorted((field, tuple(sorted(values))) for field, values in sets)))
+        return self.matches.get_or_compute(key, lambda: self._match(*key))
+
+    def _match(self, ranges, sets):
+        count = len(self.names)
+        mask = None
+        for field, low, high in ranges:
+            values, order = self.ranges[field]
+            start = 0 if low is None else np.searchsorted(values, low, side="left")
+            stop = count if high is None else np.searchsorted(values, high, side="right")
+            if mask is None and not sets and len(ranges) == 1:
+                return order[start:stop]
+            bits = np.zeros(count, dtype=bool)
+            bits[order[start:stop]] = True
+            mask = np.packbits(bits) if mask is None else mask & np.packbits(bits)
+        for field, wanted in sets:
+            bitmaps = self.bitmaps[field]
+            union = np.zeros((count + 7) // 8, dtype=np.uint8)
+            for value in wanted:
+                bits = bitmaps.get(value)
+                if bits is not None:
+                    union |= bits
+            mask = union if mask is None else mask & union
+        if mask is None:
+            return np.arange(count, dtype=np.int32)
+        return np.flatnonzero(np.unpackbits(mask, count=count)).astype(np.int32)
+
+    def sample(self, ids):
+        """A uniformly random name among ids, or None if there are none"""
+        if len(ids) == 0:
+            return None
+        return self.names[ids[secrets.randbelow(len(ids))]]
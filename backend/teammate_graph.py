@@ -0,0 +1,86 @@
+from bisect import bisect_left
+
+import numpy as np
+
+
+def _roster_pairs(rows, keys, size):
+    """Distinct ordered teammate pairs (as row1 * size + row2) from memberships sorted by roster"""
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    sizes = np.diff(np.r_[starts, len(keys)])
+    member_sizes = np.repeat(sizes, sizes)
+    member = np.repeat(np.arange(len(rows)), member_sizes)
+    offset = np.arange(len(member)) - np.repeat(np.cumsum(member_sizes) - member_sizes, member_sizes)
+    left = rows[member]
+    right = rows[np.repeat(np.repeat(starts, sizes), member_sizes) + offset]
+    distinct = left != right
+    pairs = np.sort(left[distinct] * size + right[distinct])
+    return pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if len(pairs) else pairs
+
+
+class TeammateGraph:
+    """Symmetric teammate graph in CSR form, derived from season rosters.
+
+    Row i's teammates are indices[indptr[i]:indptr[i + 1]] (player ids,
+    sorted) with the distinct seasons they shared in the same slice of
+    weights. Two players are teammates when they appear on the same
+    (team, season) roster, so the graph is symmetric by construction.
+    """
+
+    def __init__(self, indptr, indices, weights):
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        # Plain-int views for the scalar lookup, which bisects without NumPy overhead
+        self._indptr = memoryview(indptr)
+        self._indices = memoryview(indices)
+        self._weights = memoryview(weights)
+
+    @classmethod
+    def from_season_keys(cls, season_key_sets, season_bits):
+        """Build from each player's packed (team, season) keys, in player id order.
+
+        `season_bits` is the width of the season field in the low bits of a key.
+        """
+        season_key_sets = list(season_key_sets)
+        size = len(season_key_sets)
+        rows = np.repeat(np.arange(size, dtype=np.int64), [len(keys) for keys in season_key_sets])
+        keys = np.fromiter((key for keys in season_key_sets for key in keys), dtype=np.int64, count=len(rows))
+
+        # One season at a time: a pair counts once per season, even when a
+        # trade put both players on two rosters that year
+        years = keys & ((1 << season_bits) - 1)
+        order = np.lexsort((keys, years))
+        rows, keys, years = rows[order], keys[order], years[order]
+        bounds = np.r_[np.flatnonzero(np.r_[True, years[1:] != years[:-1]]), len(years)]
+        pairs = np.concatenate([_roster_pairs(rows[lo:hi], keys[lo:hi], size)
+                                for lo, hi in zip(bounds[:-1], bounds[1:])] + [np.empty(0, np.int64)])
+        if not len(pairs):
+            return cls(np.zeros(size + 1, dtype=np.int64), np.empty(0, np.int32), np.empty(0, np.int32))
+        pairs.sort()
+        starts = np.flatnonzero(np.r_[True, pairs[1:] != pairs[:-1]])
+        weights = np.diff(np.r_[starts, len(pairs)])
+        pairs = pairs[starts]
+
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pairs // size, minlength=size), out=indptr[1:])
+        return cls(indptr, (pairs % size).astype(np.int32), weights.astype(np.int32))
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.weights.nbytes
+
+    def neighbors(self, row):
+        """(teammate ids, seasons together) for player `row`"""
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return self.indices[start:end], self.weights[start:end]
+
+    def years(self, row1, row2):
+        """Distinct seasons players `row1` and `row2` spent on the same roster"""
+        start, end = self._indptr[row1], self._indptr[row1 + 1]
+        i = bisect_left(self._indices, row2, start, end)
+        if i < end and self._indices[i] == row2:
+            return self._weights[i]
+        return 0
@@ -172,7 +172,8 @@ const NBAGuessGame = () => {
         },
         body: JSON.stringify({
           guess: targetPlayer,
-          target: targetPlayer
+          target: targetPlayer,
+          reveal: true
         })
       });
 
@@ -167,7 +167,8 @@ const NBAGuessGame = () => {
         },
         body: JSON.stringify({
           guess: targetPlayer,
-          target: targetPlayer
+          target: targetPlayer,
+          reveal: true
         })
       });
 